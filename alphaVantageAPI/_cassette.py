@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import gzip
+import json
+
+from base64 import b64decode, b64encode
+from collections.abc import Mapping
+from pathlib import Path
+from threading import Lock
+
+
+def _key(parameters:dict) -> str:
+    """Canonical key of a call: its parameters, without the apikey, sorted."""
+    return json.dumps({k: str(v) for k, v in parameters.items() if k != "apikey"}, sort_keys=True)
+
+
+class _CassetteResponse(object):
+    """Recorded response with the parts of requests.Response used by
+    AlphaVantage, including streaming by iter_content()."""
+    def __init__(self, status_code:int, headers:dict, content:bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self): # -> dict
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size:int = 1):
+        chunk_size = chunk_size or len(self.content) or 1
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+class _Cassette(object):
+    """Gzipped json lines file of recorded responses.
+
+    record() appends one gzip member per call, so a cassette survives an
+    interrupted run. replay() serves the responses of the same parameters
+    in the order they were recorded and then keeps serving the last one.
+    The apikey is never written.
+
+    Args:
+        path (Path): The cassette file, i.e. "calls.jsonl.gz"
+    """
+    def __init__(self, path:Path):
+        self.path = Path(path)
+        self._lock = Lock()
+        self._responses = None
+        self._served = {}
+
+
+    def _load(self) -> dict:
+        if self._responses is None:
+            self._responses = {}
+            if self.path.exists():
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip(): continue
+                        entry = json.loads(line)
+                        self._responses.setdefault(entry["key"], []).append(entry)
+        return self._responses
+
+
+    def record(self, parameters:dict, response) -> _CassetteResponse:
+        """Downloads and appends 'response' to the cassette. Returns it as a
+        _CassetteResponse since a streamed body can only be read once."""
+        headers = response.headers if isinstance(getattr(response, "headers", None), Mapping) else {}
+        recorded = _CassetteResponse(response.status_code, dict(headers), response.content)
+        response.close()
+
+        entry = {
+            "key": _key(parameters),
+            "parameters": json.loads(_key(parameters)),
+            "status": recorded.status_code,
+            "headers": recorded.headers,
+            "body": b64encode(recorded.content).decode(),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            if self._responses is not None:
+                self._responses.setdefault(entry["key"], []).append(entry)
+        return recorded
+
+
+    def replay(self, parameters:dict) -> _CassetteResponse or None:
+        """Returns the recorded response of 'parameters' or None."""
+        key = _key(parameters)
+        with self._lock:
+            entries = self._load().get(key, None)
+            if not entries: return None
+            n = self._served.get(key, 0)
+            self._served[key] = n + 1
+            entry = entries[min(n, len(entries) - 1)]
+        return _CassetteResponse(entry["status"], entry["headers"], b64decode(entry["body"]))
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import atexit
+import os
+
+from pathlib import Path
+from queue import Queue
+from threading import Lock, Thread, get_ident
+
+import numpy as np
+from pandas import DataFrame, DatetimeIndex, Timestamp, concat
+
+
+# Serializes read-modify-write of the same dataset file
+_UPSERT_LOCK = Lock()
+
+
+def _atomic_write(path:Path, write) -> Path:
+    """Calls write(temporary path) and then renames it to 'path', so readers
+    never see a partially written file. The temporary path keeps the suffix
+    since Pandas infers some formats from it."""
+    path = Path(path)
+    part = path.with_name(f".{path.stem}.{os.getpid()}.{get_ident()}.part{path.suffix}")
+    try:
+        write(part)
+        os.replace(part, path)
+    finally:
+        if part.exists():
+            part.unlink()
+    return path
+
+
+def _write_table(df:DataFrame, path:Path, output:str, compression:str) -> None:
+    """Writes a DataFrame as 'parquet' or 'feather', keeping its index.
+    Feather only stores columns, so the index is stored as the first column."""
+    if output == "feather":
+        df = df.rename_axis(df.index.name or "index").reset_index()
+        df.to_feather(path, compression="uncompressed" if compression == "none" else compression)
+    else:
+        df.to_parquet(path, compression=None if compression == "none" else compression)
+
+
+def _read_table(path:Path, output:str, start:str = None, end:str = None, table:bool = False) -> DataFrame:
+    """Reads a DataFrame written by _write_table, optionally only the rows
+    of its ascending DatetimeIndex between 'start' and 'end' (inclusive).
+
+    Feather files are memory-mapped and sliced without copying, so many
+    processes share the page cache. Returns the pyarrow Table when 'table'
+    is True. Zero copy requires the 'none' compression."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if output == "feather":
+        data = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        index = data.column_names[0]
+    else:
+        data = pq.read_table(path, memory_map=True)
+        index = ((data.schema.pandas_metadata or {}).get("index_columns") or [None])[0]
+
+    if (start is not None or end is not None) and isinstance(index, str):
+        values = data.column(index).to_numpy()
+        if values.dtype.kind == "M":
+            lo = np.searchsorted(values, Timestamp(start).to_datetime64(), "left") if start is not None else 0
+            hi = np.searchsorted(values, Timestamp(end).to_datetime64(), "right") if end is not None else len(values)
+            data = data.slice(lo, max(0, hi - lo))
+
+    if table:
+        return data
+
+    df = data.to_pandas()
+    if output == "feather":
+        df.set_index(df.columns[0], inplace=True)
+        if df.index.name == "index":
+            df.index.name = None
+    return df
+
+
+def _upsert_table(df:DataFrame, path:Path, output:str, compression:str) -> Path:
+    """Updates and extends the dataset at 'path' with the rows of 'df'.
+    Time series stay in ascending order."""
+    with _UPSERT_LOCK:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            df = concat([_read_table(path, output), df])
+            df = df[~df.index.duplicated(keep="last")]
+            if isinstance(df.index, DatetimeIndex):
+                df = df.sort_index()
+        return _atomic_write(path, lambda part: _write_table(df, part, output, compression))
+
+
+class _ExportWriter(object):
+    """Bounded queue of exports written by a background thread.
+
+    submit() blocks only when 'maxsize' exports are already pending. Failed
+    exports are reported and kept until the next flush(). Pending exports
+    are flushed when the interpreter exits.
+
+    Args:
+        maxsize (int): Maximum pending exports. Default: 64
+    """
+    def __init__(self, maxsize:int = 64):
+        self._queue = Queue(maxsize=maxsize)
+        self._errors = []
+        self._lock = Lock()
+        self._thread = None
+
+
+    def _run(self) -> None:
+        while True:
+            path, job = self._queue.get()
+            try:
+                job()
+            except Exception as ex:
+                print(f"[X] Export failed: {path}\n    {ex}")
+                with self._lock:
+                    self._errors.append((path, ex))
+            finally:
+                self._queue.task_done()
+
+
+    def submit(self, path:Path, job) -> Path:
+        """Queues job(), the export to 'path'."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="av-export", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        self._queue.put((Path(path), job))
+        return Path(path)
+
+
+    def flush(self) -> list:
+        """Blocks until all queued exports are written. Returns the
+        (path, exception) of exports that failed since the last flush."""
+        self._queue.join()
+        with self._lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+
+# One writer per process, shared by the AlphaVantage instances
+_WRITER, _WRITER_PID = None, None
+_WRITER_LOCK = Lock()
+
+def _export_writer() -> _ExportWriter:
+    """Returns the export writer of this process, a new one after a fork."""
+    global _WRITER, _WRITER_PID
+    with _WRITER_LOCK:
+        if _WRITER is None or _WRITER_PID != os.getpid():
+            _WRITER, _WRITER_PID = _ExportWriter(), os.getpid()
+        return _WRITER
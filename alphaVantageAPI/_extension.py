@@ -4,14 +4,25 @@ import pandas as pd
 from time import perf_counter
 
 from os import getenv as os_getenv
+from threading import Lock
 from ._base_pandas_object import *
 from .utils import final_time
 from alphaVantageAPI.alphavantage import AlphaVantage
 
 
-# Load an instance of AV with user's environment variable "AV_API_KEY"
-# Force Clean
-_AV_ = AlphaVantage(api_key=None, clean=True)
+# The instance of AV with user's environment variable "AV_API_KEY"
+# Force Clean. Created on first use by _av() so importing stays cheap
+_AV_ = None
+_AV_LOCK = Lock()
+
+def _av() -> AlphaVantage:
+    """Returns the shared AlphaVantage instance of the 'av' extension."""
+    global _AV_
+    if _AV_ is None:
+        with _AV_LOCK:
+            if _AV_ is None:
+                _AV_ = AlphaVantage(api_key=None, clean=True)
+    return _AV_
 
 
 @pd.api.extensions.register_dataframe_accessor("av")
@@ -38,150 +49,151 @@ class AlphaVantageDownloader(BasePandasObject):
 
     def help(self, keyword=None, **kwargs):
         """Simple Help Screen"""
-        _AV_.help(keyword)
+        _av().help(keyword)
 
 
 
     # Global Quote
     def quote(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.quote(symbol, **kwargs)
+        self._df = _av().quote(symbol, **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     # Search
     def search(self, keywords:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.search(keywords, **kwargs)
+        self._df = _av().search(keywords, **kwargs)
         self._df.name = keywords.upper()
         return self._df
 
     # Earnings Calendar
     def earnings(self, symbol:str = None, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.earnings(symbol=symbol, **kwargs)
+        self._df = _av().earnings(symbol=symbol, **kwargs)
         return self._df
 
     # IPO Calendar
     def ipos(self, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.ipos(**kwargs)
+        self._df = _av().ipos(**kwargs)
         return self._df
 
     # Listing State
     def delisted(self, date:str = None, **kwargs):
-        self._df = _AV_.listed(date=date, state="delisted", **kwargs)
+        self._df = _av().listed(date=date, state="delisted", **kwargs)
         return self._df
 
     def listed(self, date:str = None, **kwargs):
-        self._df = _AV_.listed(date=date, **kwargs)
+        self._df = _av().listed(date=date, **kwargs)
         return self._df
 
     # Company Information
     def overview(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.overview(symbol, **kwargs)
+        self._df = _av().overview(symbol, **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def balance(self, symbol:str, **kwargs) -> pd.DataFrame:
-        result = _AV_.balance(symbol, **kwargs)
+        result = _av().balance(symbol, **kwargs)
         self._df.name = result[0].name = result[1].name = symbol.upper()
         return result[0], result[1]
 
     def cashflow(self, symbol:str, **kwargs) -> pd.DataFrame:
-        result = _AV_.cashflow(symbol, **kwargs)
+        result = _av().cashflow(symbol, **kwargs)
         self._df.name = result[0].name = result[1].name = symbol.upper()
         return result[0], result[1]
 
     def income(self, symbol:str, **kwargs) -> pd.DataFrame:
-        result = _AV_.income(symbol, **kwargs)
+        result = _av().income(symbol, **kwargs)
         self._df.name = result[0].name = result[1].name = symbol.upper()
         return result[0], result[1]
 
 
     # Securities
     def daily(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.data(symbol=symbol, function="D", **kwargs)
+        self._df = _av().data(symbol=symbol, function="D", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def daily_adjusted(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.data(symbol=symbol, function="DA", **kwargs)
+        self._df = _av().data(symbol=symbol, function="DA", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def intraday(self, symbol:str, interval=5, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.intraday(symbol, interval=interval, **kwargs)
+        self._df = _av().intraday(symbol, interval=interval, **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def intraday_ext(self, symbol:str, interval=5, slice="year1month1", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.intraday_extended(symbol, interval=interval, slice=slice, **kwargs)
-        self._df.name = symbol.upper()
+        self._df = _av().intraday_extended(symbol, interval=interval, slice=slice, **kwargs)
+        if isinstance(self._df, pd.DataFrame):
+            self._df.name = symbol.upper()
         return self._df
 
     def monthly(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.data(symbol=symbol, function="M", **kwargs)
+        self._df = _av().data(symbol=symbol, function="M", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def monthly_adjusted(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.data(symbol=symbol, function="MA", **kwargs)
+        self._df = _av().data(symbol=symbol, function="MA", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def weekly(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.data(symbol=symbol, function="W", **kwargs)
+        self._df = _av().data(symbol=symbol, function="W", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def weekly_adjusted(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.data(symbol=symbol, function="WA", **kwargs)
+        self._df = _av().data(symbol=symbol, function="WA", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
 
     # Crypto/Digital
     def crypto_rating(self, symbol:str, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.crypto_rating(symbol, function="CR", **kwargs)
+        self._df = _av().crypto_rating(symbol, function="CR", **kwargs)
         self._df.name = symbol.upper()
         return self._df
 
     def digital_daily(self, symbol:str, market:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.digital(symbol, market=market, function="CD", **kwargs)
+        self._df = _av().digital(symbol, market=market, function="CD", **kwargs)
         self._df.name = f"{symbol.upper()}.{market.upper()}"
         return self._df
 
     def digital_monthly(self, symbol:str, market:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.digital(symbol, market=market, function="CM", **kwargs)
+        self._df = _av().digital(symbol, market=market, function="CM", **kwargs)
         self._df.name = f"{symbol.upper()}.{market.upper()}"
         return self._df
 
     def digital_weekly(self, symbol:str, market:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.digital(symbol, market=market, function="CW", **kwargs)
+        self._df = _av().digital(symbol, market=market, function="CW", **kwargs)
         self._df.name = f"{symbol.upper()}.{market.upper()}"
         return self._df
 
 
     # FX
     def fxrate(self, from_currency:str, to_currency:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.fxrate(from_currency=from_currency, to_currency=to_currency, **kwargs)
+        self._df = _av().fxrate(from_currency=from_currency, to_currency=to_currency, **kwargs)
         self._df.name = f"{from_currency.upper()}.{to_currency.upper()}"
         return self._df
 
     def fx_daily(self, from_symbol:str, to_symbol:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXD", **kwargs)
+        self._df = _av().fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXD", **kwargs)
         self._df.name = f"{from_symbol.upper()}.{to_symbol.upper()}"
         return self._df
 
     def fx_intraday(self, from_symbol:str, to_symbol:str = "USD", interval=5, **kwargs) -> pd.DataFrame:
-        self._df = _AV_.fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXI", interval=interval, **kwargs)
+        self._df = _av().fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXI", interval=interval, **kwargs)
         self._df.name = f"{from_symbol.upper()}.{to_symbol.upper()}"
         return self._df
 
     def fx_monthly(self, from_symbol:str, to_symbol:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXM", **kwargs)
+        self._df = _av().fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXM", **kwargs)
         self._df.name = f"{from_symbol.upper()}.{to_symbol.upper()}"
         return self._df
 
     def fx_weekly(self, from_symbol:str, to_symbol:str = "USD", **kwargs) -> pd.DataFrame:
-        self._df = _AV_.fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXW", **kwargs)
+        self._df = _av().fx(from_symbol=from_symbol, to_symbol=to_symbol, function="FXW", **kwargs)
         self._df.name = f"{from_symbol.upper()}.{to_symbol.upper()}"
         return self._df
 
@@ -220,65 +232,128 @@ class AlphaVantageDownloader(BasePandasObject):
 
     @property
     def api_key(self) -> str:
-        return _AV_.api_key
+        return _av().api_key
 
     @api_key.setter
     def api_key(self, value:str) -> None:
-        _AV_.api_key = value
+        _av().api_key = value
 
 
     @property
     def clean(self) -> bool:
-        return _AV_.clean
+        return _av().clean
 
     @clean.setter
     def clean(self, value:str) -> None:
-        _AV_.clean = value
+        _av().clean = value
 
 
     @property
     def export(self) -> bool:
-        return _AV_.export
+        return _av().export
 
     @export.setter
     def export(self, value:str) -> None:
-        _AV_.export = value
+        _av().export = value
+
+
+    @property
+    def export_async(self) -> bool:
+        return _av().export_async
+
+    @export_async.setter
+    def export_async(self, value:bool) -> None:
+        _av().export_async = value
 
 
     @property
     def output(self) -> str:
-        return _AV_.output
+        return _av().output
 
     @output.setter
     def output(self, value:str) -> None:
-        _AV_.output = value
+        _av().output = value
+
+
+    @property
+    def compression(self) -> str:
+        return _av().compression
+
+    @compression.setter
+    def compression(self, value:str) -> None:
+        _av().compression = value
 
 
     @property
     def output_size(self) -> str:
-        return _AV_.output_size
+        return _av().output_size
 
     @output_size.setter
     def output_size(self, value:str) -> None:
-        _AV_.output_size = value
+        _av().output_size = value
 
 
     @property
     def premium(self) -> bool:
-        return _AV_.premium
+        return _av().premium
 
     @premium.setter
     def premium(self, value:str) -> None:
-        _AV_.premium = value
+        _av().premium = value
+
+
+    @property
+    def cassette(self):
+        return _av().cassette
+
+    @cassette.setter
+    def cassette(self, value:str) -> None:
+        _av().cassette = value
+
+
+    @property
+    def cassette_mode(self) -> str:
+        return _av().cassette_mode
+
+    @cassette_mode.setter
+    def cassette_mode(self, value:str) -> None:
+        _av().cassette_mode = value
+
+
+    @property
+    def daily_quota(self) -> int:
+        return _av().daily_quota
+
+    @daily_quota.setter
+    def daily_quota(self, value:int) -> None:
+        _av().daily_quota = value
+
+
+    @property
+    def history_size(self) -> int:
+        return _av().history_size
+
+    @history_size.setter
+    def history_size(self, value:int) -> None:
+        _av().history_size = value
+
+
+    @property
+    def processes(self) -> int:
+        return _av().processes
+
+    @processes.setter
+    def processes(self, value:int) -> None:
+        _av().processes = value
 
 
     @property
     def proxy(self) -> dict:
-        return _AV_.proxy
+        return _av().proxy
 
     @proxy.setter
     def proxy(self, value:dict) -> None:
-        _AV_.proxy = value
+        _av().proxy = value
 
 
     # Get only properties
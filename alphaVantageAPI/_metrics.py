@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock, local
+from time import perf_counter
+from typing import NamedTuple
+
+from pandas import DataFrame
+
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, float("inf")
+)
+
+# Phases of an API call in the order they happen
+PHASES = ("throttle", "network", "decode", "dataframe", "clean", "export", "total")
+
+
+class _Call(NamedTuple):
+    """Compact record of an API call for the call history. The apikey and
+    the other parameters are not kept."""
+    time: float         # Epoch seconds when the call started
+    function: str
+    symbol: str         # None for functions without a symbol
+    status: int         # HTTP status code, None when the request failed
+    bytes: int          # Size of the response body
+    seconds: float      # Total duration
+    timings: tuple      # ((phase, seconds), ...) of this call
+    cached: bool        # True when served without calling the API
+
+
+class _Histogram(object):
+    """Latency histogram with fixed BUCKETS. Not thread safe by itself."""
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+    def observe(self, seconds:float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+
+    def quantile(self, q:float) -> float:
+        """Estimates the 'q' quantile by interpolating within its bucket."""
+        if self.count < 1: return float("nan")
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n > 0 and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = min(BUCKETS[i], self.max)
+                return lower + (upper - lower) * max(0.0, rank - seen) / n
+            seen += n
+        return self.max
+
+
+# Counters: name -> help text. Rendered with a "_total" suffix
+COUNTERS = {
+    "av_calls": "API calls by function and HTTP status",
+    "av_response_bytes": "Response bytes downloaded by function",
+    "av_cache_requests": "API calls by cache result, hit or miss",
+    "av_throttle_waits": "API calls delayed by the free key rate limit by priority",
+    "av_request_errors": "API requests that raised before a response",
+    "av_deadline_misses": "API calls whose deadline passed waiting for the rate limit",
+    "av_quota_rejections": "API calls rejected by the daily quota by priority",
+    "av_api_messages": "Responses with a Note, Information or Error Message instead of data",
+    "av_hook_errors": "Before and after request hooks that raised",
+}
+
+
+def _labels(labels:tuple) -> str:
+    """Formats (name, value) pairs as OpenMetrics labels."""
+    if not labels: return ""
+    escape = lambda x: str(x).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+class _Metrics(object):
+    """Registry of the counters and the per function and phase latency
+    histograms of API calls.
+
+    Phases are timed with the phase() context manager. A phase excludes the
+    time of the phases nested in it, i.e. "dataframe" excludes "clean" and
+    "export", so the phases of a call add up to its "total"."""
+    def __init__(self):
+        self._lock = Lock()
+        self._local = local()
+        self._histograms = {}
+        self._counters = {}
+
+
+    def inc(self, name:str, value:float = 1, **labels) -> None:
+        """Adds 'value' to the counter 'name' with the given 'labels'."""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+
+    def counter(self, name:str, **labels) -> float:
+        """Returns the sum of the counter 'name' over the series matching 'labels'."""
+        match = set((k, str(v)) for k, v in labels.items())
+        with self._lock:
+            return sum(v for (n, l), v in self._counters.items() if n == name and match <= set(l))
+
+
+    def record(self, call) -> None:
+        """Counts a finished _Call and observes its "total" duration."""
+        self.observe(call.function, "total", call.seconds)
+        self.inc("av_calls", function=call.function, status=call.status or "none")
+        self.inc("av_response_bytes", call.bytes, function=call.function)
+        self.inc("av_cache_requests", result="hit" if call.cached else "miss")
+
+
+    def observe(self, function:str, phase:str, seconds:float) -> None:
+        with self._lock:
+            key = (function, phase)
+            if key not in self._histograms:
+                self._histograms[key] = _Histogram()
+            self._histograms[key].observe(seconds)
+
+
+    @contextmanager
+    def call(self):
+        """Collects the {phase: seconds} of the phases timed by this thread
+        during the call into the yielded dict."""
+        timings = self._local.__dict__.get("timings", None)
+        self._local.timings = {}
+        try:
+            yield self._local.timings
+        finally:
+            self._local.timings = timings
+
+
+    @contextmanager
+    def phase(self, function:str, phase:str):
+        """Times the exclusive duration of a 'phase' of a 'function' call."""
+        stack = self._local.__dict__.setdefault("stack", [])
+        nested = [0.0]
+        stack.append(nested)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            stack.pop()
+            if stack: stack[-1][0] += elapsed
+            self.observe(function, phase, elapsed - nested[0])
+
+            timings = self._local.__dict__.get("timings", None)
+            if timings is not None:
+                timings[phase] = timings.get(phase, 0.0) + elapsed - nested[0]
+
+
+    def histogram(self, function:str, phase:str = "total") -> _Histogram or None:
+        return self._histograms.get((function, phase), None)
+
+
+    def summary(self, function:str = None) -> DataFrame:
+        """Returns count, mean, p50, p90, p99 and max seconds per function and phase."""
+        with self._lock:
+            items = sorted(
+                [(k, h) for k, h in self._histograms.items() if function is None or k[0] == function],
+                key=lambda x: (x[0][0], PHASES.index(x[0][1]) if x[0][1] in PHASES else len(PHASES))
+            )
+            rows = [{
+                "function": f, "phase": p, "count": h.count, "mean": h.sum / h.count,
+                "p50": h.quantile(0.5), "p90": h.quantile(0.9), "p99": h.quantile(0.99), "max": h.max
+            } for (f, p), h in items]
+
+        df = DataFrame(rows, columns=["function", "phase", "count", "mean", "p50", "p90", "p99", "max"])
+        return df.set_index(["function", "phase"])
+
+
+    def render(self) -> str:
+        """Returns the counters and histograms in the OpenMetrics text format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        lines = []
+        for name, text in COUNTERS.items():
+            series = [(l, v) for (n, l), v in counters if n == name]
+            lines += [f"# TYPE {name} counter", f"# HELP {name} {text}."]
+            lines += [f"{name}_total{_labels(l)} {v}" for l, v in series]
+
+        name = "av_phase_seconds"
+        lines += [f"# TYPE {name} histogram", f"# HELP {name} Duration of the phases of API calls."]
+        for (function, phase), h in histograms:
+            labels, cumulative = (("function", function), ("phase", phase)), 0
+            for le, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                le = "+Inf" if le == float("inf") else le
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_count{_labels(labels)} {h.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {h.sum}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
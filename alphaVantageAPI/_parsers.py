@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+
+import numpy as np
+from pandas import DataFrame, Index
+
+
+class _JsonTimeSeries(object):
+    """Incremental parser of an AlphaVantage time series json response.
+
+    Walks the response as its bytes chunks arrive and fills growing NumPy
+    float arrays one date entry at a time. The nested dict of strings of
+    the "Time Series (...)" object is never built. Any other top level
+    value, i.e. "Meta Data" or "Note", is decoded as usual.
+
+    Args:
+        chunks (iterable): bytes chunks, i.e. Response.iter_content()
+        capacity (int): Initial rows of the preallocated arrays. Default: 1024
+    """
+    def __init__(self, chunks, capacity:int = 1024):
+        self._chunks = iter(chunks)
+        self._decode = getincrementaldecoder("utf-8")().decode
+        self._decoder = JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._capacity = max(1, capacity)
+
+
+    def _more(self) -> bool:
+        """Appends the next chunk to the buffer. False when exhausted."""
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            return False
+
+        if self._pos > 0:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += self._decode(chunk)
+        return True
+
+
+    def _peek(self) -> str:
+        """Skips whitespace and returns the next character or '' at the end."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._more():
+                return ""
+
+
+    def _expect(self, token:str) -> None:
+        if self._peek() != token:
+            raise JSONDecodeError(f"Expecting '{token}'", self._buffer, self._pos)
+        self._pos += 1
+
+
+    def _value(self):
+        """Decodes the next complete json value, reading more chunks as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError:
+                if self._more(): continue
+                raise
+            # A number could continue into the next chunk
+            if end == len(self._buffer) and self._more(): continue
+            self._pos = end
+            return value
+
+
+    def _series(self) -> DataFrame:
+        """Parses a '{"date": {"field": "value", ...}, ...}' object."""
+        capacity, n = self._capacity, 0
+        dates, columns = [], {}
+
+        self._expect("{")
+        while self._peek() != "}":
+            if n > 0: self._expect(",")
+            date = self._value()
+            self._expect(":")
+            row = self._value()
+
+            if n == capacity:
+                capacity *= 2
+                for name in columns:
+                    columns[name] = np.resize(columns[name], capacity)
+                    columns[name][n:] = np.nan
+
+            for name, value in row.items():
+                if name not in columns:
+                    columns[name] = np.full(capacity, np.nan)
+                columns[name][n] = float(value)
+            dates.append(date)
+            n += 1
+        self._pos += 1
+
+        return DataFrame({name: values[:n] for name, values in columns.items()}, index=Index(dates))
+
+
+    def parse(self) -> dict:
+        """Returns the response as a dict where the time series is a DataFrame."""
+        result = {}
+
+        self._expect("{")
+        while self._peek() != "}":
+            if len(result) > 0: self._expect(",")
+            key = self._value()
+            self._expect(":")
+
+            if key != "Meta Data" and self._peek() == "{":
+                result[key] = self._series()
+            else:
+                result[key] = self._value()
+        return result
+
+
+def _json_time_series(chunks, capacity:int = 1024) -> dict:
+    """Incrementally parses a time series json response from bytes chunks."""
+    return _JsonTimeSeries(chunks, capacity).parse()
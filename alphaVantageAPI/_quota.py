@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+
+try:
+    import fcntl
+except ImportError: # Windows, the ledger is then only shared by threads
+    fcntl = None
+
+
+# Priority classes of API calls, highest first
+PRIORITIES = ("interactive", "realtime", "batch")
+
+# Fraction of the daily quota a priority may not spend, so it stays
+# available to the higher priorities
+QUOTA_RESERVE = {"interactive": 0.0, "realtime": 0.05, "batch": 0.2}
+
+# AlphaVantage's day boundary
+QUOTA_TZ = "America/New_York"
+
+
+def _today(tz:str = QUOTA_TZ) -> str:
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo(tz)).date().isoformat()
+    except Exception: # No tz database
+        return datetime.now(timezone.utc).date().isoformat()
+
+
+class _QuotaLedger(object):
+    """Daily quota ledger of an apikey persisted in 'path', shared by the
+    threads and processes using the key.
+
+    A call is admitted while the calls spent today plus one stay within the
+    'limit' less the QUOTA_RESERVE of its priority. The count restarts at
+    midnight of QUOTA_TZ. The apikey itself is not written, only a hash.
+
+    Args:
+        path (Path): Directory of the ledgers
+        apikey (str): The AlphaVantage API key
+        limit (int): Calls per day. 0 is unlimited
+    """
+    _lock = Lock()
+
+    def __init__(self, path:Path, apikey:str, limit:int):
+        name = sha256(str(apikey).encode()).hexdigest()[:16]
+        self.file = Path(path) / f"{name}.json"
+        self.limit = limit
+
+
+    @contextmanager
+    def _locked(self):
+        """Holds the ledger across threads and processes."""
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        with _QuotaLedger._lock, open(self.file.with_suffix(".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+    def _read(self) -> dict:
+        today = _today()
+        try:
+            ledger = json.loads(self.file.read_text())
+        except (OSError, ValueError):
+            ledger = {}
+        if ledger.get("day") != today:
+            ledger = {"day": today, "used": 0, "priorities": {}, "rejected": {}}
+        return ledger
+
+
+    def _write(self, ledger:dict) -> None:
+        part = self.file.with_name(f".{self.file.name}.{os.getpid()}.part")
+        part.write_text(json.dumps(ledger))
+        os.replace(part, self.file)
+
+
+    def admit(self, priority:str = "interactive") -> bool:
+        """Spends one call of today's quota for a 'priority' call if admitted."""
+        if self.limit < 1: return True
+
+        with self._locked():
+            ledger = self._read()
+            allowed = self.limit * (1.0 - QUOTA_RESERVE.get(priority, 0.0))
+            admitted = ledger["used"] + 1 <= allowed
+
+            counts = ledger["priorities"] if admitted else ledger["rejected"]
+            counts[priority] = counts.get(priority, 0) + 1
+            ledger["used"] += 1 if admitted else 0
+            self._write(ledger)
+        return admitted
+
+
+    def refund(self, priority:str = "interactive") -> None:
+        """Gives back a call admitted for a 'priority' call that was not made."""
+        if self.limit < 1: return
+
+        with self._locked():
+            ledger = self._read()
+            if ledger["priorities"].get(priority, 0) > 0:
+                ledger["priorities"][priority] -= 1
+                ledger["used"] = max(0, ledger["used"] - 1)
+                self._write(ledger)
+
+
+    def exhaust(self) -> None:
+        """Marks today's quota as spent, i.e. when the API says so."""
+        with self._locked():
+            ledger = self._read()
+            ledger["used"] = max(ledger["used"], self.limit)
+            self._write(ledger)
+
+
+    def status(self) -> dict:
+        """Returns today's day, used, limit, remaining, admitted priorities
+        and rejected priorities."""
+        with self._locked():
+            ledger = self._read()
+        remaining = max(0, self.limit - ledger["used"]) if self.limit > 0 else None
+        return {
+            "day": ledger["day"], "used": ledger["used"], "limit": self.limit, "remaining": remaining,
+            "priorities": ledger["priorities"], "rejected": ledger["rejected"],
+        }
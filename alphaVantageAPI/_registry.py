@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import json
+
+from functools import lru_cache
+from pathlib import Path, PurePath
+from types import MappingProxyType
+from typing import Callable, NamedTuple
+
+from .validate import _compile
+
+
+API_FILE = Path(PurePath(__file__).parent / "data/api.json")
+
+
+class _Function(NamedTuple):
+    """An AlphaVantage API function of the registry."""
+    function: str
+    alias: str
+    description: str
+    required: tuple
+    optional: tuple
+    indicator: bool
+    validate: Callable
+
+
+class _Registry(object):
+    """Immutable, precompiled view of the AlphaVantage API json.
+
+    Built once per process by _load_registry and shared by every
+    AlphaVantage instance. Functions are keyed by both their name and
+    alias, so parameter lookups do not scan the API lists.
+
+    Args:
+        api (dict): The decoded API json
+    """
+    def __init__(self, api:dict):
+        self.series = tuple(MappingProxyType(x) for x in api["series"])
+        self.indicators = tuple(MappingProxyType(x) for x in api["indicator"])
+
+        self.series_names = tuple(x["function"] for x in self.series)
+        self.indicator_names = tuple(x["function"] for x in self.indicators)
+        self.indicator_set = frozenset(self.indicator_names)
+
+        self.function = MappingProxyType({x["alias"]: x["function"] for x in self.series})
+        self.function_inv = MappingProxyType({v: k for k, v in self.function.items()})
+
+        self.datatype = tuple(api["datatype"])
+        self.horizon = tuple(api["horizon"])
+        self.listing_state = tuple(api["listing_state"])
+        self.matype = tuple(api["matype"])
+        self.outputsize = tuple(api["outputsize"])
+        self.series_interval = tuple(api["series_interval"])
+        self.series_interval_minutes = tuple(int(x.replace("min", "")) for x in self.series_interval)
+        self.slice = tuple(api["slice"])
+
+        # Parameter rules are compiled into one validator per function
+        rules = api.get("validate", {})
+        choices = {"matype": self.matype}
+
+        functions = {}
+        for x in self.series + self.indicators:
+            optional = tuple(x.get("optional", []))
+            f = _Function(
+                function=x["function"],
+                alias=x.get("alias", x["function"]),
+                description=x.get("description", ""),
+                required=tuple(x.get("required", [])),
+                optional=optional,
+                indicator=x["function"] in self.indicator_set,
+                validate=_compile(x["function"], optional, rules, choices),
+            )
+            functions[f.function] = f
+            functions.setdefault(f.alias, f)
+        self.functions = MappingProxyType(functions)
+
+
+    def parameters(self, function:str, kind:str) -> tuple:
+        """Returns 'required' or 'optional' parameters for a 'function'."""
+        f = self.functions.get(function, None)
+        if f is None or kind not in ["required", "optional"]:
+            return ()
+        return f.required if kind == "required" else f.optional
+
+
+    def validate(self, function:str, parameters:dict, kwargs:dict) -> dict:
+        """Attaches the valid optional 'kwargs' of a 'function' to 'parameters'.
+        Raises a ValueError for invalid values."""
+        f = self.functions.get(function, None)
+        return f.validate(parameters, kwargs) if f is not None else parameters
+
+
+@lru_cache(maxsize=None)
+def _load_registry(api_file:Path = API_FILE) -> _Registry:
+    """Loads the API json file once per process."""
+    api_file = Path(api_file)
+    if not api_file.exists():
+        raise ValueError(f"{api_file} does not exist.")
+
+    with api_file.open("r") as content:
+        return _Registry(json.load(content))
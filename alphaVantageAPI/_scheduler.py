@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import heapq
+
+from hashlib import sha256
+from itertools import count
+from threading import Condition, Lock
+from time import monotonic
+
+from ._quota import PRIORITIES
+
+
+class _Ticket(object):
+    __slots__ = ("key", "start", "cancelled")
+
+    def __init__(self, key:tuple, start:float):
+        self.key = key
+        self.start = start
+        self.cancelled = False
+
+    def __lt__(self, other) -> bool:
+        return self.key < other.key
+
+
+class _Scheduler(object):
+    """Grants the API call slots of one apikey, one every 'interval' seconds.
+
+    Waiting calls are granted by priority class, "interactive" before
+    "realtime" before "batch", so batch calls only use the slots left over.
+    Within a class, calls with a deadline go earliest deadline first and the
+    others are weighted fair queued by caller: each caller gets slots in
+    proportion to its weight however many calls it queues.
+
+    Args:
+        interval (float): Seconds between calls. Default: 15.0001
+    """
+    def __init__(self, interval:float = 15.0001):
+        self.interval = interval
+        self._cond = Condition()
+        self._waiting = []
+        self._next = 0.0
+        self._order = count()
+        self._virtual = {x: 0.0 for x in PRIORITIES}
+        self._finish = {}
+
+
+    def acquire(self, priority:str = "interactive", caller:str = "default", weight:float = 1.0, deadline:float = None) -> bool or None:
+        """Blocks until the call gets a slot. Returns True after waiting for
+        one, False when granted at once or None when the 'deadline'
+        (monotonic seconds) passed first."""
+        with self._cond:
+            # Weighted fair queuing: a caller's calls finish 1 / weight apart
+            # in the virtual time of its class
+            start = max(self._virtual[priority], self._finish.get((priority, caller), 0.0))
+            finish = start + 1.0 / max(weight, 1e-6)
+            self._finish[(priority, caller)] = finish
+
+            rank = PRIORITIES.index(priority)
+            ticket = _Ticket((rank, deadline if deadline is not None else float("inf"), finish, next(self._order)), start)
+            heapq.heappush(self._waiting, ticket)
+
+            waited = False
+            while True:
+                while self._waiting[0].cancelled:
+                    heapq.heappop(self._waiting)
+
+                now = monotonic()
+                if deadline is not None and now > deadline:
+                    ticket.cancelled = True
+                    self._cond.notify_all()
+                    return None
+
+                if self._waiting[0] is ticket and now >= self._next:
+                    heapq.heappop(self._waiting)
+                    self._virtual[priority] = max(self._virtual[priority], ticket.start)
+                    if all(x.cancelled for x in self._waiting):
+                        # Idle, so the fair share starts over
+                        self._waiting.clear()
+                        self._virtual = {x: 0.0 for x in PRIORITIES}
+                        self._finish.clear()
+                    self._next = now + self.interval
+                    self._cond.notify_all()
+                    return waited
+
+                waited = True
+                timeout = self._next - now if self._waiting[0] is ticket else None
+                if deadline is not None:
+                    timeout = min(timeout if timeout is not None else float("inf"), deadline - now)
+                self._cond.wait(timeout)
+
+
+    def waiting(self) -> dict:
+        """Returns the number of waiting calls by priority."""
+        with self._cond:
+            result = {x: 0 for x in PRIORITIES}
+            for ticket in self._waiting:
+                if not ticket.cancelled:
+                    result[PRIORITIES[ticket.key[0]]] += 1
+            return result
+
+
+# One scheduler per apikey, shared by the AlphaVantage instances using it
+_SCHEDULERS = {}
+_SCHEDULERS_LOCK = Lock()
+
+def _scheduler(apikey:str) -> _Scheduler:
+    name = sha256(str(apikey).encode()).hexdigest()
+    with _SCHEDULERS_LOCK:
+        if name not in _SCHEDULERS:
+            _SCHEDULERS[name] = _Scheduler()
+        return _SCHEDULERS[name]
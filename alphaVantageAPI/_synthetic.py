@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+
+# Formats of the dates keying AlphaVantage time series
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+def _parse_date(value:str) -> (datetime, str):
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt), fmt
+        except ValueError:
+            pass
+    raise ValueError(f"[X] Not a time series date: {value}")
+
+
+def _scale_series(series:dict, n:int) -> dict:
+    """Extends a '{"date": {...}, ...}' time series, newest first, to 'n'
+    times its rows. Older dates continue the spacing of the two newest
+    dates and the rows repeat."""
+    dates, rows = list(series.keys()), list(series.values())
+    if len(dates) < 2: return dict(series)
+
+    newest, fmt = _parse_date(dates[0])
+    step = newest - _parse_date(dates[1])[0]
+
+    return {
+        (newest - step * i).strftime(fmt): rows[i % len(rows)]
+        for i in range(n * len(rows))
+    }
+
+
+def scale_json(payload:dict, n:int) -> dict:
+    """Returns a synthetic json response with 'n' times the rows of 'payload'.
+    Time series and fundamental reports are scaled, anything else, i.e.
+    "Meta Data" or a quote, is returned as is."""
+    if n < 2: return payload
+
+    result = {}
+    for key, value in payload.items():
+        if key.startswith("Meta Data"):
+            result[key] = value
+        elif key in ["quarterlyReports", "annualReports"] and isinstance(value, list):
+            result[key] = value * n
+        elif isinstance(value, dict) and len(value) > 1 and all(isinstance(x, dict) for x in value.values()):
+            result[key] = _scale_series(value, n)
+        else:
+            result[key] = value
+    return result
+
+
+def scale_csv(text:str, n:int) -> str:
+    """Returns a synthetic csv response with 'n' times the rows of 'text'."""
+    if n < 2: return text
+
+    header, _, rows = text.partition("\n")
+    rows = rows.rstrip("\n")
+    return f"{header}\n" + "\n".join([rows] * n) + "\n"
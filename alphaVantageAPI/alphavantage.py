@@ -1,27 +1,62 @@
 # -*- coding: utf-8 -*-
 import json
 import os
-import requests
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from importlib.util import find_spec
-from pathlib import Path, PurePath
+from io import BufferedReader, BytesIO, StringIO
+from pathlib import Path
 from pprint import pprint
 from re import sub as re_sub
 from sys import exit as sys_exit
-from time import sleep as tsleep
+from threading import Lock
+from time import monotonic, perf_counter, time
 
-from pandas import DataFrame, DatetimeIndex
+from pandas import DataFrame, DatetimeIndex, concat, read_csv
 
-from .utils import is_home
-from .validate import _validate
+from ._cassette import _Cassette
+from ._export import _atomic_write, _export_writer, _read_table, _upsert_table
+from ._metrics import _Call, _Metrics
+from ._quota import PRIORITIES, _QuotaLedger
+from ._scheduler import _scheduler
+from ._parsers import _json_time_series
+from ._registry import API_FILE, _load_registry
+from .utils import _IterStream, _counted, is_home
 
 
 Ymd_format = "%Y-%m-%d"
+# Optional dependencies are only located here, Pandas imports them when used
 excel = find_spec("openpyxl") is not None
-if excel is not None:
-    try: import openpyxl
-    except ImportError: pass
+arrow = find_spec("pyarrow") is not None
+
+# Functions that only respond with csv
+CSV_FUNCTIONS = ["EARNINGS_CALENDAR", "IPO_CALENDAR", "LISTING_STATUS", "TIME_SERIES_INTRADAY_EXTENDED"]
+# Functions that do not respond with a time series json
+NON_SERIES_FUNCTIONS = [
+    "CRYPTO_RATING", "GLOBAL_QUOTE", "CURRENCY_EXCHANGE_RATE", "SYMBOL_SEARCH",
+    "OVERVIEW", "INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW"
+]
+# Keys of the json responses that carry a message instead of data, i.e.
+# "Note" when the free key call frequency is exceeded
+API_MESSAGES = ("Note", "Information", "Error Message")
+# Parameters naming the symbol of a call for the call history, in order
+SYMBOL_PARAMETERS = ("symbol", "symbols", "from_symbol", "from_currency", "keywords")
+
+
+def _requests(): # -> module
+    """Imports requests on first use instead of when this module is imported."""
+    global requests
+    import requests
+    return requests
+
+
+def __getattr__(name:str):
+    # Module attribute 'requests', i.e. for patch("...alphavantage.requests.get")
+    if name == "requests":
+        return _requests()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Missing API Key Message
@@ -50,9 +85,17 @@ class AlphaVantage(object):
     datatype: str = "json"
     export: bool = False
     export_path: str = "~/av_data"
+    export_async: bool = False
     output: str = "csv"
+    compression: str = "zstd"
     clean: bool = False
     proxy: dict = dict()
+    processes: int = 0
+    history_size: int = 1000
+    end_point: str = "https://www.alphavantage.co/query"
+    cassette: str = "~/av_data/cassette.jsonl.gz"
+    cassette_mode: str = "off"
+    daily_quota: int = 0
     
     Examples
     --------
@@ -68,32 +111,52 @@ class AlphaVantage(object):
             premium:bool = False,
             export:bool = False,
             export_path:str = "~/av_data",
+            export_async:bool = False,
             output:str = "csv",
+            compression:str = "zstd",
             datatype:str = "json",
             output_size:str = "compact",
             clean:bool = False,
-            proxy:dict = {}
+            proxy:dict = {},
+            processes:int = 0,
+            history_size:int = 1000,
+            end_point:str = None,
+            cassette:str = None,
+            cassette_mode:str = "off",
+            daily_quota:int = 0
         ) -> None:
 
-        # Load API json file        
-        api_file = Path(PurePath(__file__).parent / "data/api.json")
-        self._load_api(api_file)
+        # Load API json file
+        self._load_api(API_FILE)
         
         # Initialize Class properties
         self.api_key     = api_key
         self.premium     = premium
         self.export      = export
         self.export_path = export_path
+        self.export_async = export_async
 
         self.output      = output
+        self.compression = compression
         self.datatype    = datatype
         self.output_size = output_size
         self.proxy       = proxy
         self.clean       = clean
+        self.processes   = processes
 
-        self._requests_session = requests.session()
-        self._response_history = []
+        self.history_size = history_size
+        self.end_point   = end_point
+        self.cassette    = cassette
+        self.cassette_mode = cassette_mode
+        self.daily_quota = daily_quota
+        self._ledger = None
+
+        self.__requests_session = None
         self._api_call_count = 0
+        self._pool_lock = Lock()
+        self._export_writer = _export_writer()
+        self._metrics = _Metrics()
+        self._hooks = {"before": [], "after": []}
 
 
     # Private Methods
@@ -108,34 +171,27 @@ class AlphaVantage(object):
 
 
     def _load_api(self, api_file:Path) -> None:
-        """Load API from a JSON file."""
-        if api_file.exists():
-            with api_file.open("r") as content:
-                api = json.load(content)
-            content.close()
-
-            self.__api = api
-            self._api_lists()
-        else:
-            raise ValueError(f"{api_file} does not exist.")
+        """Load API from a JSON file, parsed once and shared by all instances."""
+        self._registry = _load_registry(api_file)
+        self._api_lists()
 
 
     def _api_lists(self) -> None:
         """Initialize lists based on API."""
-        self.series = [x for x in self.__api["series"]]
-        self.__api_series = [x["function"] for x in self.series]
-        self.__api_function = {x["alias"]: x["function"] for x in self.__api["series"]}
-        self.__api_function_inv = {v: k for k, v in self.__api_function.items()}
-        self.__api_datatype = self.__api["datatype"]
-        self.__api_horizon = self.__api["horizon"]
-        self.__api_listing_state = self.__api["listing_state"]
-        self.__api_outputsize = self.__api["outputsize"]
-        self.__api_series_interval = self.__api["series_interval"]
-        self.__api_slice = self.__api["slice"]
-
-        self.indicators = [x for x in self.__api["indicator"]]
-        self.__api_indicator = [x["function"] for x in self.indicators]
-        self.__api_indicator_matype = self.__api["matype"]
+        self.series = self._registry.series
+        self.__api_series = self._registry.series_names
+        self.__api_function = self._registry.function
+        self.__api_function_inv = self._registry.function_inv
+        self.__api_datatype = self._registry.datatype
+        self.__api_horizon = self._registry.horizon
+        self.__api_listing_state = self._registry.listing_state
+        self.__api_outputsize = self._registry.outputsize
+        self.__api_series_interval = self._registry.series_interval
+        self.__api_slice = self._registry.slice
+
+        self.indicators = self._registry.indicators
+        self.__api_indicator = self._registry.indicator_set
+        self.__api_indicator_matype = self._registry.matype
 
 
     def _function_alias(self, function:str) -> str:
@@ -145,71 +201,188 @@ class AlphaVantage(object):
 
     def _parameters(self, function:str, kind:str) -> list:
         """Returns 'required' or 'optional' parameters for a 'function'."""
-        result = []
-        if kind in ["required", "optional"]:
-            try:
-                all_functions = self.series + self.indicators
-                result = [x[kind] for x in all_functions if kind in x and function == x["function"]].pop()
-            except IndexError:
-                pass
-        return result
+        return list(self._registry.parameters(function, kind))
+
+
+    def _quota_ledger(self) -> _QuotaLedger:
+        """Returns the daily quota ledger of the api_key, kept in export_path/.quota."""
+        ledger = _QuotaLedger(self.export_path / ".quota", self.api_key, self.daily_quota)
+        if self._ledger is None or (self._ledger.file, self._ledger.limit) != (ledger.file, ledger.limit):
+            self._ledger = ledger
+        return self._ledger
+
+
+    def _throttle(self, priority:str = "interactive", caller:str = "default", weight:float = 1.0, deadline:float = None) -> bool:
+        """Blocks until the scheduler of the api_key grants the call a slot of
+        the free key rate limit, 15.0001 seconds apart. Shared by threads and
+        instances using the key. False when the 'deadline' passed first."""
+        if self.premium: return True
+
+        waited = _scheduler(self.api_key).acquire(priority, caller, weight, deadline)
+        if waited:
+            self._metrics.inc("av_throttle_waits", priority=priority)
+        return waited is not None
 
 
     def _av_api_call(self, parameters:dict, timeout:int = 60, **kwargs) -> DataFrame or json or None:
-        """Main method to handle AlphaVantage API call request and response."""
+        """Main method to handle AlphaVantage API call request and response.
+        Records the call in the call history."""
+        function, start, started = parameters["function"], perf_counter(), time()
+        symbol = next((parameters[x] for x in SYMBOL_PARAMETERS if x in parameters), None)
+        call = {"status": None, "bytes": 0, "cached": False}
+
+        context = {"function": function, "symbol": symbol, "parameters": dict(parameters), "time": started}
+        self._run_hooks("before", context)
+
+        response = None
+        with self._metrics.call() as timings:
+            try:
+                response = self.__av_api_call(parameters, timeout, call, **kwargs)
+                return response
+            finally:
+                record = _Call(
+                    started, function, symbol, call["status"], call["bytes"],
+                    perf_counter() - start, tuple(timings.items()), call["cached"]
+                )
+                self._response_history.append(record)
+                self._metrics.record(record)
+                self._run_hooks("after", {**context, "call": record, "response": response})
+
+
+    def _run_hooks(self, when:str, context:dict) -> None:
+        """Calls the 'when' hooks with the request 'context'. A failing hook
+        is reported and counted but does not fail the API call."""
+        for hook in self._hooks[when]:
+            try:
+                hook(context)
+            except Exception as ex:
+                self._metrics.inc("av_hook_errors", when=when)
+                print(f"[X] {when} hook {getattr(hook, '__name__', hook)} failed: {ex}")
+
+
+    def __av_api_call(self, parameters:dict, timeout:int, call:dict, **kwargs) -> DataFrame or json or None:
         proxies = kwargs["proxies"] if "proxies" in kwargs else self.proxy
 
-        # Everything is ok so far, add the AV API Key
-        parameters["apikey"] = self.api_key
+        function, phase = parameters["function"], self._metrics.phase
+        replay = self.cassette_mode == "replay"
+        priority = kwargs.pop("priority", "interactive")
+        if priority not in PRIORITIES:
+            raise ValueError(f"[X] priority: '{priority}' is not one of {list(PRIORITIES)}")
+        caller, weight = kwargs.pop("caller", "default"), kwargs.pop("weight", 1.0)
+        deadline = kwargs.pop("deadline", None) # Seconds to get a slot
+        deadline = monotonic() + deadline if deadline is not None else None
+
+        # Calls served by the cassette are neither scheduled nor spend quota
+        # Admitted before waiting for a slot, so rejected calls do not use one
+        if not replay:
+            if not self._quota_ledger().admit(priority):
+                self._metrics.inc("av_quota_rejections", function=function, priority=priority)
+                print(f"[X] Daily quota of {self.daily_quota} calls: {function} rejected, {priority} calls are out of quota")
+                return None
+
+            with phase(function, "throttle"):
+                granted = self._throttle(priority, caller, weight, deadline)
+            if not granted:
+                self._quota_ledger().refund(priority)
+                self._metrics.inc("av_deadline_misses", function=function, priority=priority)
+                print(f"[X] {function} {priority} call missed its deadline waiting for the rate limit")
+                return None
+
+        # The datatype of this call, i.e. "csv" for the CSV_FUNCTIONS wrappers
+        datatype = kwargs.pop("datatype", self.datatype)
+
+        # Large csv responses are streamed and parsed (or written) chunk by chunk
+        # unless they are parsed by the process pool
+        chunk_size = kwargs.pop("chunk_size", 1 << 16)
+        stream_to = kwargs.pop("stream_to", None)
+        csv_stream = datatype == "csv" and parameters["function"] in CSV_FUNCTIONS
+        csv_stream = csv_stream and (self.processes < 1 or stream_to is not None)
 
-        if not self.premium and self._api_call_count > 0:
-            tsleep(15.0001)
+        # Full json time series are parsed incrementally into NumPy arrays
+        json_stream = kwargs.pop("stream", self.output_size == "full") and self.processes < 1
+        json_stream = json_stream and datatype == "json" and parameters["function"] not in NON_SERIES_FUNCTIONS + CSV_FUNCTIONS
 
         # Ready to Go. Format and get request response
+        requests, response = _requests(), None
         try:
-            # response =  self._requests_session.get(
-            response =  requests.get(  # Use till self._requests_session can be mocked in unittests
-                AlphaVantage.END_POINT,
-                params = parameters,
-                timeout = timeout,
-                proxies = proxies
-            )
+            with phase(function, "network"):
+                if replay:
+                    # Served from the cassette, no network
+                    response = self._cassette.replay(parameters)
+                    if response is None:
+                        print(f"[X] Not in the cassette {self._cassette.path}: {function}")
+                        return None
+                    call["cached"] = True
+                else:
+                    # response =  self._requests_session.get(
+                    response =  requests.get(  # Use till self._requests_session can be mocked in unittests
+                        self.end_point,
+                        params = {**parameters, "apikey": self.api_key}, # Not kept by parameters
+                        timeout = timeout,
+                        proxies = proxies,
+                        stream = csv_stream or json_stream
+                    )
+                    if self.cassette_mode == "record":
+                        response = self._cassette.record(parameters, response)
         except requests.exceptions.RequestException as ex:
-            print(f"[X] response.get() exception: {ex}\n    parameters: {parameters}")
-            pass
+            self._metrics.inc("av_request_errors", function=function, error=type(ex).__name__)
+            print(f"[X] response.get() exception: {ex}\n    parameters: {function}")
+            return None
         finally:
-            response.close()
+            if response is not None and not (csv_stream or json_stream):
+                response.close()
 
+        call["status"] = response.status_code
         if response.status_code != 200:
             print(f"[X] Request Failed: {response.status_code}.\nText:\n{response.text}\n{parameters['function']}")
+            response.close()
+            return None
 
-        # If 'json' datatype, return as 'json'. Otherwise return text response for 'csv'
-        if self.datatype == "json":
-            response = response.json()
-        else:
-            response = response.text
+        if not (csv_stream or json_stream):
+            content = getattr(response, "content", None) # Already downloaded
+            call["bytes"] = len(content) if isinstance(content, bytes) else 0
 
-        self._response_history.append(parameters)
-        # **Underdevelopment**
-        # self._response_history.append({"last": time.localtime(), "parameters": parameters})
-        if self.datatype == "json":
-            response = self._to_dataframe(parameters["function"], response)
+        # Streamed bodies download while they are decoded, so it is all "decode"
+        if csv_stream:
+            try:
+                with phase(function, "decode"):
+                    chunks = _counted(response.iter_content(chunk_size=chunk_size), call)
+                    if stream_to is not None:
+                        download = self._write_chunks(Path(stream_to), chunks)
+                    else:
+                        download = self._csv_to_dataframe(parameters["function"], BufferedReader(_IterStream(chunks), chunk_size))
+            finally:
+                response.close()
+            response = download
+        elif json_stream:
+            try:
+                with phase(function, "decode"):
+                    download = _json_time_series(_counted(response.iter_content(chunk_size=chunk_size), call))
+            finally:
+                response.close()
+            with phase(function, "dataframe"):
+                response = self._to_dataframe(parameters["function"], download, parameters)
+        elif self.processes > 0 and (datatype == "json" or parameters["function"] in CSV_FUNCTIONS):
+            # Decode and build the DataFrame in another process, export here
+            with phase(function, "decode"):
+                response = self._process_pool().submit(
+                    _parse_response, parameters["function"], datatype, self.clean, response.content
+                ).result()
+
+            if self.export and datatype == "json" and response is not None:
+                if isinstance(response, list):
+                    self._save_df(parameters["function"], response[0], parameters, report_freq="Quarterly")
+                    self._save_df(parameters["function"], response[1], parameters, report_freq="Annually")
+                else:
+                    self._save_df(parameters["function"], response, parameters)
+        elif datatype == "json":
+            # If 'json' datatype, return as 'json'. Otherwise return text response for 'csv'
+            with phase(function, "decode"):
+                response = response.json()
+            with phase(function, "dataframe"):
+                response = self._to_dataframe(parameters["function"], response, parameters)
         else:
-            _TSIE = "TIME_SERIES_INTRADAY_EXTENDED"
-            _csv_functions = ["EARNINGS_CALENDAR", "IPO_CALENDAR", "LISTING_STATUS", _TSIE]
-            if parameters["function"] in _csv_functions:
-                response = response.replace("\r", "")
-                response = DataFrame(
-                    [x.split(",") for x in response.split("\n")[1:]],
-                    columns=[x for x in response.split("\n")[0].split(",")]
-                )
-                response = response.mask(response.eq("None")).dropna()
-            
-            if parameters["function"] == _TSIE:
-                response = response.iloc[::-1]
-                response.set_index(DatetimeIndex(response["time"]), inplace=True)
-                response.drop(["time"], axis=1, inplace=True)
-                response.index.name = "datetime"
+            response = response.text
 
         if self._api_call_count < 1:
             self._api_call_count += 1
@@ -217,8 +390,27 @@ class AlphaVantage(object):
         return response
 
 
-    def _to_dataframe(self, function:str, response:dict) -> DataFrame:
-        """Converts json response into a Pandas DataFrame given a 'function'"""
+    def _process_pool(self): # -> ProcessPoolExecutor
+        """Returns the process pool for parsing responses, created on first use."""
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_all_start_methods, get_context
+
+        with self._pool_lock:
+            if self._pool is None:
+                method = "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+                self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=get_context(method))
+            return self._pool
+
+
+    def _to_dataframe(self, function:str, response:dict, parameters:dict = None) -> DataFrame:
+        """Converts json response into a Pandas DataFrame given a 'function'.
+        Exported when export is True and the call 'parameters' are given."""
+        message = next((x for x in API_MESSAGES if x in response), None)
+        if message is not None:
+            self._metrics.inc("av_api_messages", function=function, message=message)
+            print(f"[X] {function} {message}: {response[message]}")
+            return None
+
         try:
             json_keys = response.keys()
             key = [x for x in json_keys if not x.startswith("Meta Data")].pop()
@@ -264,14 +456,18 @@ class AlphaVantage(object):
             reports = [quarterlydf, annuallydf]
         else:
             # Otherwise it is a time-series, also calls df = df.iloc[::-1] below
-            df = DataFrame.from_dict(response[key], dtype=float).T
+            # Unless it was already parsed incrementally by _json_time_series
+            if isinstance(response[key], DataFrame):
+                df = response[key]
+            else:
+                df = DataFrame.from_dict(response[key], dtype=float).T
             df.index.rename("date", inplace=True)
 
         # Handle Reports / Search / GC /
         if reports is not None and len(reports) > 0:
-            if self.export:
-                self._save_df(function, reports[0], report_freq="Quarterly")
-                self._save_df(function, reports[1], report_freq="Annually")
+            if self.export and parameters is not None:
+                self._save_df(function, reports[0], parameters, report_freq="Quarterly")
+                self._save_df(function, reports[1], parameters, report_freq="Annually")
             return reports
         else:
             if function != "SYMBOL_SEARCH":
@@ -279,29 +475,74 @@ class AlphaVantage(object):
                 df.reset_index(inplace=True)
 
             if self.clean:
-                df = self._simplify_dataframe_columns(function, df)
-
-                if function in ["SYMBOL_SEARCH"]: pass
-                elif function == "CURRENCY_EXCHANGE_RATE":
-                    df.set_index("refreshed", inplace=True)
-                elif function == "CRYPTO_RATING":
-                    df.drop(["index"], axis=1, inplace=True)
-                    df.set_index("symbol", inplace=True)
-                elif function == "GLOBAL_QUOTE":
-                    df.drop(["index"], axis=1, inplace=True)
-                    df.set_index("symbol", inplace=True)
-                elif function != "OVERVIEW":
-                    df.set_index(DatetimeIndex(df["date"]), inplace=True)
-                    df.drop(["date"], axis=1, inplace=True)
-                else:
-                    df.set_index("item", inplace=True)
+                with self._metrics.phase(function, "clean"):
+                    df = self._simplify_dataframe_columns(function, df)
+
+                    if function in ["SYMBOL_SEARCH"]: pass
+                    elif function == "CURRENCY_EXCHANGE_RATE":
+                        df.set_index("refreshed", inplace=True)
+                    elif function == "CRYPTO_RATING":
+                        df.drop(["index"], axis=1, inplace=True)
+                        df.set_index("symbol", inplace=True)
+                    elif function == "GLOBAL_QUOTE":
+                        df.drop(["index"], axis=1, inplace=True)
+                        df.set_index("symbol", inplace=True)
+                    elif function != "OVERVIEW":
+                        df.set_index(DatetimeIndex(df["date"]), inplace=True)
+                        df.drop(["date"], axis=1, inplace=True)
+                    else:
+                        df.set_index("item", inplace=True)
+
+            if self.export and parameters is not None:
+                self._save_df(function, df, parameters)
+
+        return df
 
-            if self.export:
-                self._save_df(function, df)
 
+    def _csv_to_dataframe(self, function:str, response:str or BufferedReader) -> DataFrame:
+        """Converts csv response into a Pandas DataFrame given a 'function'.
+        Parsed by Pandas' C reader instead of Python lists of split strings.
+        When 'response' is a stream, it is read incrementally into column
+        buffers so peak memory is bounded by the chunk size."""
+        if isinstance(response, str):
+            response = StringIO(response)
+        df = read_csv(response, keep_default_na=False, na_values=["None"])
+        df.dropna(inplace=True)
+
+        if function == "TIME_SERIES_INTRADAY_EXTENDED":
+            df = df.iloc[::-1]
+            df.set_index(DatetimeIndex(df["time"]), inplace=True)
+            df.drop(["time"], axis=1, inplace=True)
+            df.index.name = "datetime"
         return df
 
 
+    def _write_chunks(self, path:Path, chunks) -> Path:
+        """Writes streamed response chunks to 'path' through a temporary file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(f"{path.name}.part")
+        with part.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        part.replace(path)
+        return path
+
+
+    def _slices(self, value) -> list:
+        """Returns a list of Intraday Extended slices given "all", a slice, a list
+        of slices or a range of slice numbers (1 to 24)."""
+        if isinstance(value, str):
+            value = value.lower()
+            if value == "all":
+                return list(self.__api_slice)
+            value = [value]
+        elif isinstance(value, range):
+            value = [self.__api_slice[i - 1] for i in value if 0 < i <= len(self.__api_slice)]
+        elif not isinstance(value, (list, tuple)):
+            return []
+        return [x.lower() for x in value if isinstance(x, str) and x.lower() in self.__api_slice]
+
+
     def _simplify_dataframe_columns(self, function:str, df:DataFrame) -> DataFrame or None:
         """Simplifies DataFrame Column Names given a 'function'."""
         if function == "CURRENCY_EXCHANGE_RATE":
@@ -322,17 +563,14 @@ class AlphaVantage(object):
         return df
 
 
-    def _save_df(self, function:str, df:DataFrame, **kwargs) -> None:
-        """Save Pandas DataFrame to a file type given a 'function'."""
+    def _export_file(self, function:str, parameters:dict, report_freq:str = None) -> str:
+        """Returns the export file path, without extension, given a 'function'
+        and the 'parameters' of its call."""
         # Get the alias for the 'function' so filenames are short
         short_function = self._function_alias(function)
 
-        # Get the 'parameters' from the last AV api call since it was successful
-        parameters = self.last()
-
         dt_now = datetime.now().strftime(Ymd_format)
 
-        report_freq = kwargs.pop("report_freq", None)
         # Determine Path
         if function == "CURRENCY_EXCHANGE_RATE": # ok
             path = f"{self.export_path}/{parameters['from_currency']}{parameters['to_currency']}"
@@ -386,21 +624,83 @@ class AlphaVantage(object):
                 path += f"_FOR_{parameters['date']}"
         else:
             path = f"{self.export_path}/{parameters['symbol']}_{short_function}"
+        return path
+
+
+    def _dataset_file(self, function:str, parameters:dict, report_freq:str = None, output:str = None) -> Path:
+        """Returns the parquet or feather dataset file of a 'function' call in
+        the export_path partitioned as: function=/interval=/symbol=/data.ext
+        Function first, so one dataset read spans every symbol."""
+        p = parameters
+        if "from_currency" in p:
+            symbol = f"{p['from_currency']}{p['to_currency']}"
+        elif "from_symbol" in p:
+            symbol = f"{p['from_symbol']}{p['to_symbol']}"
+        elif "keywords" in p:
+            symbol = f"SEARCH_{p['keywords']}"
+        else:
+            symbol = f"{p.get('symbol', 'ALL')}{p.get('market', '')}"
+
+        name = self._function_alias(function)
+        if isinstance(report_freq, str):
+            name += f"_{report_freq}"
+        if "series_type" in p:
+            name += f"_{p['series_type'][0].upper()}"
+        if "time_period" in p:
+            name += f"_{p['time_period']}"
+        if p.get("adjusted") == "true":
+            name += "_ADJ"
+        if function == "LISTING_STATUS" and p.get("state") == "delisted":
+            name = f"DE{name}"
+
+        interval = p.get("interval", "none")
+        output = output or self.output
+        return self.export_path / f"function={name}" / f"interval={interval}" / f"symbol={symbol}" / f"data.{output}"
+
+
+    def _save_df(self, function:str, df:DataFrame, parameters:dict, **kwargs) -> Path:
+        """Save Pandas DataFrame to a file type given a 'function' and the
+        'parameters' of its call."""
+        with self._metrics.phase(function, "export"):
+            return self.__save_df(function, df, parameters, **kwargs)
+
+
+    def __save_df(self, function:str, df:DataFrame, parameters:dict, **kwargs) -> Path:
+        report_freq = kwargs.pop("report_freq", None)
+
+        # Snapshot, the caller may change df before the writer thread writes it
+        if self.export_async:
+            df = df.copy()
+
+        # Columnar formats are upserted into one partitioned dataset file
+        if self.output in ["parquet", "feather"]:
+            path = self._dataset_file(function, parameters, report_freq)
+            job = lambda: _upsert_table(df, path, self.output, self.compression)
+            return self._export_writer.submit(path, job) if self.export_async else job()
+
+        path = self._export_file(function, parameters, report_freq)
         path += f".{self.output}"
 
         # Export desired format
         if self.output == "csv":
-            df.to_csv(path)
+            write = df.to_csv
         elif self.output == "json":
-            df.to_json(path)
+            write = df.to_json
         elif self.output == "pkl":
-            df.to_pickle(path)
+            write = df.to_pickle
         elif self.output == "html":
-            df.to_html(path)
+            write = df.to_html
         elif self.output == "txt":
-            Path(path).write_text(df.to_string())
+            write = lambda part: Path(part).write_text(df.to_string())
         elif excel and self.output == "xlsx":
-            df.to_excel(path, sheet_name = parameters["function"])
+            write = lambda part: df.to_excel(part, sheet_name = parameters["function"])
+        else:
+            return None
+
+        # Written by the background thread or now, either way atomically
+        if self.export_async:
+            return self._export_writer.submit(path, lambda: _atomic_write(path, write))
+        return _atomic_write(path, write)
 
 
     # Public Methods
@@ -421,7 +721,7 @@ class AlphaVantage(object):
         if interval is not None:
             if isinstance(interval, str) and interval in self.__api_series_interval:
                 parameters["interval"] = interval
-            elif isinstance(interval, int) and interval in [int(re_sub(r'min', "", x)) for x in self.__api_series_interval]:
+            elif isinstance(interval, int) and interval in self._registry.series_interval_minutes:
                 parameters["interval"] = f"{interval}min"
             else:
                 return None
@@ -435,10 +735,7 @@ class AlphaVantage(object):
             if required in kwargs:
                 parameters[required] = kwargs[required]
 
-        optional_parameters = self._parameters(parameters["function"], "optional")
-        for option in optional_parameters:
-            if option in kwargs:
-                _validate(self.__api_indicator_matype, option, parameters, **kwargs)
+        self._registry.validate(parameters["function"], parameters, kwargs)
 
         download = self._av_api_call(parameters, **kwargs)
         return download if download is not None else None
@@ -507,7 +804,7 @@ class AlphaVantage(object):
         
         if isinstance(interval, str) and interval in self.__api_series_interval:
             parameters["interval"] = interval
-        elif isinstance(interval, int) and interval in [int(re_sub(r'min', "", x)) for x in self.__api_series_interval]:
+        elif isinstance(interval, int) and interval in self._registry.series_interval_minutes:
             parameters["interval"] = f"{interval}min"
         else:
             return None
@@ -516,8 +813,18 @@ class AlphaVantage(object):
         return download if download is not None else None
 
 
-    def intraday_extended(self, symbol:str, interval=5, slice="year1month1", adjusted=True, **kwargs) -> DataFrame or None:
-        """Simple wrapper to _av_api_call method for Intraday Extended requests."""
+    def intraday_extended(self, symbol:str, interval=5, slice="year1month1", adjusted=True, **kwargs) -> DataFrame or dict or None:
+        """Simple wrapper to _av_api_call method for Intraday Extended requests.
+
+        A 'slice' of "all", a list of slices or a range of slice numbers (1 to 24)
+        are downloaded concurrently (workers=4) and returned as one deduplicated and
+        ascending DataFrame. With stream=True, each slice's csv is written straight
+        to the export_path as it downloads and a dict of {slice: Path} is returned
+        instead. Slices that fail are reported and listed in the DataFrame's
+        attrs["missing_slices"], or are None in the dict. None when every slice
+        failed."""
+        workers = kwargs.pop("workers", 4)
+        stream = kwargs.pop("stream", False)
         parameters = {
             "function": "TIME_SERIES_INTRADAY_EXTENDED",
             "symbol": symbol.upper(),
@@ -526,20 +833,49 @@ class AlphaVantage(object):
 
         if isinstance(interval, str) and interval in self.__api_series_interval:
             parameters["interval"] = interval
-        elif isinstance(interval, int) and interval in [int(re_sub(r'min', "", x)) for x in self.__api_series_interval]:
+        elif isinstance(interval, int) and interval in self._registry.series_interval_minutes:
             parameters["interval"] = f"{interval}min"
         else:
             return None
 
-        if isinstance(slice, str) and slice.lower() in self.__api_slice:
-            parameters["slice"] = slice.lower()
-
-        self.datatype = "csv" # Returns csv by default
-        download = self._av_api_call(parameters, **kwargs)
+        slices = self._slices(slice)
+        if len(slices) < 2 and not stream:
+            if len(slices) > 0:
+                parameters["slice"] = slices[0]
+            download = self._av_api_call(parameters, datatype="csv", **kwargs)
+
+            if self.export and download is not None:
+                self._save_df(parameters["function"], download, parameters)
+            return download if download is not None else None
+
+        if len(slices) < 1: return None
+        def _fetch(name:str) -> DataFrame or Path:
+            _parameters = {**parameters, "slice": name}
+            if stream:
+                path = f"{self._export_file(parameters['function'], _parameters)}.csv"
+                return self._av_api_call(_parameters, stream_to=path, datatype="csv", **kwargs)
+            return self._av_api_call(_parameters, datatype="csv", **kwargs)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(_fetch, name): name for name in slices}
+            results = {futures[future]: future.result() for future in as_completed(futures)}
+
+        missing = [name for name in slices if results[name] is None]
+        if missing:
+            print(f"[X] {parameters['function']} {parameters['symbol']}: {len(missing)} of {len(slices)} slices failed: {', '.join(missing)}")
+
+        if stream:
+            return {name: results[name] for name in slices}
+        if len(missing) == len(slices): return None
+
+        # year1month1 is the most recent slice, so concat the oldest first
+        download = concat([results.pop(name) for name in reversed(slices) if name not in missing])
+        download = download[~download.index.duplicated(keep="last")].sort_index()
+        download.attrs["missing_slices"] = missing
 
         if self.export:
-            self._save_df(parameters["function"], download)
-        return download if download is not None else None
+            self._save_df(parameters["function"], download, {**parameters, "slice": f"{slices[0]}-{slices[-1]}"})
+        return download
 
 
     def earnings(self, symbol:str = None, **kwargs) -> DataFrame or None:
@@ -555,13 +891,12 @@ class AlphaVantage(object):
         if isinstance(horizon, str) and horizon in self.__api_horizon:
             parameters["horizon"] = horizon
 
-        self.datatype = "csv" # Returns csv by default
-        download = self._av_api_call(parameters, **kwargs)
+        download = self._av_api_call(parameters, datatype="csv", **kwargs)
         download.set_index(index, inplace=True)
         download.sort_index(axis=0, ascending=ascending, inplace=True)
 
         if self.export:
-            self._save_df(parameters["function"], download)
+            self._save_df(parameters["function"], download, parameters)
         return download if download is not None else None
 
 
@@ -571,13 +906,12 @@ class AlphaVantage(object):
         ascending = kwargs.pop("asc", True)
         index = kwargs.pop("index", "symbol")
 
-        self.datatype = "csv"
-        download = self._av_api_call(parameters, **kwargs) # returns DataFrame
+        download = self._av_api_call(parameters, datatype="csv", **kwargs) # returns DataFrame
         download.set_index(index, inplace=True)
         download.sort_index(axis=0, ascending=ascending, inplace=True)
 
         if self.export:
-            self._save_df(parameters["function"], download)
+            self._save_df(parameters["function"], download, parameters)
         return download if download is not None else None
 
 
@@ -595,13 +929,12 @@ class AlphaVantage(object):
         if isinstance(state, str) and state in self.__api_listing_state:
             parameters["state"] = state.lower()
 
-        self.datatype = "csv" # Returns csv by default
-        download = self._av_api_call(parameters, **kwargs)
+        download = self._av_api_call(parameters, datatype="csv", **kwargs)
         download.set_index(index, inplace=True)
         download.sort_index(axis=0, ascending=ascending, inplace=True)
 
         if self.export:
-            self._save_df(parameters["function"], download)
+            self._save_df(parameters["function"], download, parameters)
         return download if download is not None else None
 
     # Company Information
@@ -638,13 +971,15 @@ class AlphaVantage(object):
         if isinstance(symbol, str):
             symbol = symbol.upper()
 
-        # TODO: Refactor for multithreading
-        # Process a symbol list and return a list of DataFrames
+        # Process a symbol list concurrently and return a dict of DataFrames
         if isinstance(symbol, list) and len(symbol) > 1:
+            workers = kwargs.pop("workers", 4)
             # Create list: symbols, with all elements Uppercase from the list: symbol
             symbols = list(map(str.upper, symbol))
             # Call self.data for each ticker in the list: symbols
-            return {ticker: self.data(ticker, function, **kwargs) for ticker in symbols}
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = {ticker: executor.submit(self.data, ticker, function, **kwargs) for ticker in symbols}
+            return {ticker: future.result() for ticker, future in futures.items()}
 
         try:
             function = self.__api_function[function] if function not in self.__api_indicator else function
@@ -664,21 +999,53 @@ class AlphaVantage(object):
             if required in kwargs:
                 parameters[required] = kwargs[required]
 
-        optional_parameters = self._parameters(parameters["function"], "optional")
-        for option in optional_parameters:
-            if option in kwargs:
-                _validate(self.__api_indicator_matype, option, parameters, **kwargs)
+        self._registry.validate(parameters["function"], parameters, kwargs)
 
         download = self._av_api_call(parameters, **kwargs)
         return download if download is not None else None
 
 
 
+    def read(self, symbol:str, function:str = "D", start:str = None, end:str = None, **kwargs) -> DataFrame or dict or None:
+        """Reads a series exported with the 'parquet' or 'feather' output from
+        the export_path, optionally only between the 'start' and 'end' dates.
+
+        Feather files are memory-mapped, so use compression="none" for zero copy
+        reads shared by many processes. Pass the same parameters as the call
+        that exported it, i.e. interval, series_type, time_period or market.
+        With table=True, the pyarrow Table is returned instead."""
+        table = kwargs.pop("table", False)
+        output = kwargs.pop("output", self.output)
+        report_freq = kwargs.pop("report_freq", None)
+
+        # Read a symbol list and return a dict of DataFrames
+        if isinstance(symbol, list):
+            return {ticker.upper(): self.read(ticker, function, start, end, table=table, output=output, report_freq=report_freq, **kwargs) for ticker in symbol}
+
+        function = self.__api_function.get(function, function)
+        parameters = {"function": function, "symbol": symbol.upper(), **kwargs}
+
+        interval = parameters.get("interval", None)
+        if isinstance(interval, int):
+            parameters["interval"] = f"{interval}min"
+        if function in ["TIME_SERIES_INTRADAY", "TIME_SERIES_INTRADAY_EXTENDED"]:
+            parameters["adjusted"] = parameters.get("adjusted", True)
+        if isinstance(parameters.get("adjusted", None), bool):
+            parameters["adjusted"] = "true" if parameters["adjusted"] else "false"
+
+        outputs = [output] if output in ["parquet", "feather"] else ["parquet", "feather"]
+        for output in outputs:
+            path = self._dataset_file(function, parameters, report_freq, output)
+            if path.exists():
+                return _read_table(path, output, start, end, table)
+        return None
+
+
     def help(self, keyword:str = None) -> None:
         """Simple help system to print 'required' or 'optional' parameters based on a keyword."""
         def _functions(): print(f"   Functions:\n    {', '.join(self.__api_series)}")
-        def _indicators(): print(f"  Indicators:\n    {', '.join(self.__api_indicator)}")
-        def _aliases(): pprint(self.__api_function, indent=4)
+        def _indicators(): print(f"  Indicators:\n    {', '.join(self._registry.indicator_names)}")
+        def _aliases(): pprint(dict(self.__api_function), indent=4)
 
         if keyword is None:
             print(f"{AlphaVantage.__name__} Help: Input a function name for more infomation on 'required'\nAvailable Functions:\n")
@@ -693,7 +1060,7 @@ class AlphaVantage(object):
             keyword = keyword.upper()
             required = self._parameters(keyword, "required")
             optional = self._parameters(keyword, "optional")
-            description = [x for x in self.series + self.indicators if x["function"] == keyword][0]["description"]
+            description = self._registry.functions[keyword].description
 
             print(f"\n   Function: {keyword}")
             print(f"Description: {description}")
@@ -701,17 +1068,65 @@ class AlphaVantage(object):
             print(f"   Optional: {', '.join(optional)}") if optional else None
 
 
+    def timings(self, function:str = None) -> DataFrame:
+        """Returns the latency (seconds) of each phase of the API calls per function:
+        count, mean, p50, p90, p99 and max. Phases: throttle, network, decode,
+        dataframe, clean, export and total."""
+        return self._metrics.summary(function)
+
+
+    def quota(self) -> dict:
+        """Returns today's quota of the api_key shared by all processes: day,
+        used, limit, remaining and the admitted and rejected calls by priority."""
+        return self._quota_ledger().status()
+
+
+    def openmetrics(self) -> str:
+        """Returns the call counters and phase latency histograms in the
+        OpenMetrics text format, i.e. for a local scrape endpoint."""
+        return self._metrics.render()
+
+
+    def add_hook(self, when:str, hook) -> None:
+        """Registers hook(context) to be called "before" or "after" each request.
+        The context dict has the function, symbol, parameters (without the apikey)
+        and time. After hooks also get the "call" record and the "response"."""
+        if when not in self._hooks:
+            raise ValueError(f"[X] when: '{when}' is not one of {list(self._hooks)}")
+        self._hooks[when].append(hook)
+
+
+    def remove_hook(self, when:str, hook) -> None:
+        """Unregisters a hook added by add_hook."""
+        if hook in self._hooks.get(when, []):
+            self._hooks[when].remove(hook)
+
+
+    def flush(self) -> list:
+        """Blocks until all background exports are written. Returns a list of
+        (path, exception) for the exports that failed since the last flush."""
+        return self._export_writer.flush()
+
+
     def call_history(self) -> list:
-        """Returns a history of successful response calls."""
-        return self._response_history
+        """Returns the records of the last 'history_size' calls: time, function,
+        symbol, status, bytes, seconds, timings and cached."""
+        return list(self._response_history)
 
 
-    def last(self, n:int = 1) -> str:
-        """Returns the last \'n\' calls as a list."""
-        return (self.call_history())[-n] if n > 0 else []
+    def last(self, n:int = 1) -> _Call or list:
+        """Returns the \'n\'th most recent call record."""
+        return self._response_history[-n] if 0 < n <= len(self._response_history) else []
 
 
     # Class Properties
+    @property
+    def _requests_session(self): # -> requests.Session
+        if self.__requests_session is None:
+            self.__requests_session = _requests().session()
+        return self.__requests_session
+
+
     @property
     def api_key(self) -> str:
         return self.__apikey
@@ -740,6 +1155,18 @@ class AlphaVantage(object):
             self.__export = False
 
 
+    @property
+    def export_async(self) -> bool:
+        return self.__export_async
+
+    @export_async.setter
+    def export_async(self, value:bool) -> None:
+        if value is not None and isinstance(value, bool):
+            self.__export_async = value
+        else:
+            self.__export_async = False
+
+
     @property
     def export_path(self) -> str:
         return self.__export_path
@@ -781,6 +1208,7 @@ class AlphaVantage(object):
     def output(self, value:str) -> None:
         output_type = ["csv", "json", "pkl", "html", "txt"]
         if excel: output_type.append("xlsx")
+        if arrow: output_type.extend(["parquet", "feather"])
 
         if value is not None and value.lower() in output_type:
             self.__output = value.lower()
@@ -788,6 +1216,19 @@ class AlphaVantage(object):
             self.__output = output_type[0]
 
 
+    @property
+    def compression(self) -> str:
+        return self.__compression
+
+    @compression.setter
+    def compression(self, value:str) -> None:
+        compression_type = ["zstd", "lz4", "none"]
+        if value is not None and value.lower() in compression_type:
+            self.__compression = value.lower()
+        else:
+            self.__compression = compression_type[0]
+
+
     @property
     def datatype(self) -> str:
         return self.__datatype
@@ -800,6 +1241,57 @@ class AlphaVantage(object):
             self.__datatype = self.__api_datatype[0]
 
 
+    @property
+    def cassette(self) -> Path:
+        return self._cassette.path
+
+    @cassette.setter
+    def cassette(self, value:str) -> None:
+        # Defaults to the cassette.jsonl.gz file of the export_path
+        if value is not None and isinstance(value, (str, Path)) and str(value):
+            path = Path(value).expanduser()
+        else:
+            path = self.export_path / "cassette.jsonl.gz"
+        self._cassette = _Cassette(path)
+
+
+    @property
+    def cassette_mode(self) -> str:
+        return self.__cassette_mode
+
+    @cassette_mode.setter
+    def cassette_mode(self, value:str) -> None:
+        if value is not None and isinstance(value, str) and value.lower() in ["off", "record", "replay"]:
+            self.__cassette_mode = value.lower()
+        else:
+            self.__cassette_mode = "off"
+
+
+    @property
+    def daily_quota(self) -> int:
+        return self.__daily_quota
+
+    @daily_quota.setter
+    def daily_quota(self, value:int) -> None:
+        # 0 is unlimited, i.e. premium keys
+        if value is not None and isinstance(value, int) and value > 0:
+            self.__daily_quota = value
+        else:
+            self.__daily_quota = 0
+
+
+    @property
+    def end_point(self) -> str:
+        return self.__end_point
+
+    @end_point.setter
+    def end_point(self, value:str) -> None:
+        if value is not None and isinstance(value, str) and value.startswith(("http://", "https://")):
+            self.__end_point = value
+        else:
+            self.__end_point = AlphaVantage.END_POINT
+
+
     @property
     def proxy(self) -> dict:
         return self.__proxy
@@ -824,6 +1316,37 @@ class AlphaVantage(object):
             self.__clean = False
 
 
+    @property
+    def history_size(self) -> int:
+        return self._response_history.maxlen
+
+    @history_size.setter
+    def history_size(self, value:int) -> None:
+        # Keeps the most recent calls that still fit
+        history = getattr(self, "_response_history", ())
+        if value is not None and isinstance(value, int) and value > 0:
+            self._response_history = deque(history, maxlen=value)
+        else:
+            self._response_history = deque(history, maxlen=1000)
+
+
+    @property
+    def processes(self) -> int:
+        return self.__processes
+
+    @processes.setter
+    def processes(self, value:int) -> None:
+        # Replace the process pool, if any, since its size changed
+        pool, self._pool = getattr(self, "_pool", None), None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+        if value is not None and isinstance(value, int) and value > 0:
+            self.__processes = value
+        else:
+            self.__processes = 0
+
+
     @property
     def premium(self) -> bool:
         return self.__premium
@@ -837,7 +1360,7 @@ class AlphaVantage(object):
 
 
     def __repr__(self) -> str:
-        s  = f"{AlphaVantage.API_NAME}(\n  end_point:str = {AlphaVantage.END_POINT},\n"
+        s  = f"{AlphaVantage.API_NAME}(\n  end_point:str = {self.end_point},\n"
         s += f"  api_key:str = {self.api_key},\n  export:bool = {self.export},\n"
         s += f"  export_path:str = {self.export_path},\n  output_size:str = {self.output_size},\n"
         s += f"  output:str = {self.output},\n  datatype:str = {self.datatype},\n"
@@ -846,9 +1369,28 @@ class AlphaVantage(object):
 
 
     def __str__(self) -> str:
-        s  = f"{AlphaVantage.API_NAME}(\n  end_point:str = {AlphaVantage.END_POINT},\n"
+        s  = f"{AlphaVantage.API_NAME}(\n  end_point:str = {self.end_point},\n"
         s += f"  api_key:str = {self.api_key},\n  export:bool = {self.export},\n"
         s += f"  export_path:str = {self.export_path},\n  output_size:str = {self.output_size},\n"
         s += f"  output:str = {self.output},\n  datatype:str = {self.datatype},\n"
         s += f"  clean:bool = {self.clean},\n  proxy:dict = {self.proxy}\n)"
         return s
+
+
+
+# Per process parser for AlphaVantage(processes=n)
+_PARSER = None
+
+def _parse_response(function:str, datatype:str, clean:bool, content:bytes) -> DataFrame or list or str:
+    """Decodes a raw response and converts it into a Pandas DataFrame in a
+    worker process. The result is returned to the calling process by pickle."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = AlphaVantage(api_key="parser")
+    _PARSER.clean = clean
+
+    if datatype == "json":
+        return _PARSER._to_dataframe(function, json.loads(content))
+    elif function in CSV_FUNCTIONS:
+        return _PARSER._csv_to_dataframe(function, BytesIO(content))
+    return content.decode()
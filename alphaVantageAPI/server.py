@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""Local stand-in for the AlphaVantage API to load and concurrency test
+clients without a key or network.
+
+Serves the mock payloads of tests/test_data, optionally scaled to synthetic
+responses, at the /query end point. Latency, errors and the "Note" of the
+free key call frequency are configurable.
+
+    $ python -m alphaVantageAPI.server --port 8765 --latency 0.05 --calls-per-minute 5
+
+    >>> from alphaVantageAPI import AlphaVantage
+    >>> from alphaVantageAPI.server import StandInServer
+    >>> with StandInServer(calls_per_minute=5) as server:
+    ...     av = AlphaVantage(api_key="demo", end_point=server.url)
+    ...     df = av.data("MSFT", "D")
+"""
+import argparse
+import json
+import random
+
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path, PurePath
+from threading import Lock, Thread
+from time import monotonic, sleep
+from urllib.parse import parse_qsl, urlsplit
+
+from ._registry import _load_registry
+from ._synthetic import scale_csv, scale_json
+
+
+TEST_DATA_PATH = Path(PurePath(__file__).parent.parent / "tests/test_data")
+
+# function: mock payload. Indicators are served "mock_indicator.json"
+PAYLOADS = {
+    "CURRENCY_EXCHANGE_RATE": "mock_fx.json",
+    "FX_DAILY": "mock_fx_daily.json",
+    "FX_INTRADAY": "mock_fx_intraday.json",
+    "FX_MONTHLY": "mock_fx_monthly.json",
+    "FX_WEEKLY": "mock_fx_weekly.json",
+    "TIME_SERIES_INTRADAY": "mock_data.json",
+    "TIME_SERIES_DAILY": "mock_data.json",
+    "TIME_SERIES_DAILY_ADJUSTED": "mock_data.json",
+    "TIME_SERIES_WEEKLY": "mock_data.json",
+    "TIME_SERIES_WEEKLY_ADJUSTED": "mock_data.json",
+    "TIME_SERIES_MONTHLY": "mock_data.json",
+    "TIME_SERIES_MONTHLY_ADJUSTED": "mock_data.json",
+    "DIGITAL_CURRENCY_DAILY": "mock_digital.json",
+    "DIGITAL_CURRENCY_WEEKLY": "mock_digital.json",
+    "DIGITAL_CURRENCY_MONTHLY": "mock_digital.json",
+    "CRYPTO_RATING": "mock_digital_rating.json",
+    "GLOBAL_QUOTE": "mock_global_quote.json",
+    "OVERVIEW": "mock_overview.json",
+    "BALANCE_SHEET": "mock_balance_sheet.json",
+    "INCOME_STATEMENT": "mock_income_statement.json",
+    "CASH_FLOW": "mock_cash_flow.json",
+    "EARNINGS_CALENDAR": "mock_earnings_cal.csv",
+    "IPO_CALENDAR": "mock_ipos_cal.csv",
+    "LISTING_STATUS": "mock_listed_status.csv",
+    "TIME_SERIES_INTRADAY_EXTENDED": "mock_intra_ext_adj_15min_y1m1.csv",
+}
+
+NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API call frequency is {n} calls per minute"
+    " and 500 calls per day. Please visit https://www.alphavantage.co/premium/ if you would like"
+    " to target a higher API call frequency."
+)
+INVALID_CALL = "Invalid API call. Please retry or visit the documentation (https://www.alphavantage.co/documentation/) for {function}."
+INVALID_KEY = "the parameter apikey is invalid or missing. Please claim your free API key on (https://www.alphavantage.co/support/#api-key)."
+
+
+class StandInServer(object):
+    """AlphaVantage stand-in HTTP server.
+
+    Args:
+        host (str): Default: "127.0.0.1"
+        port (int): 0 picks a free port. Default: 0
+        data_path (Path): Directory of the mock payloads. Default: tests/test_data
+        latency (float): Seconds added to every response. Default: 0
+        jitter (float): Up to this many random seconds added to the latency. Default: 0
+        error_rate (float): Fraction of calls answered with 'error_status'. Default: 0
+        error_status (int): HTTP status of the injected errors. Default: 503
+        calls_per_minute (int): Calls per apikey and minute before the "Note"
+            response. 0 is unlimited. Default: 0
+        scale (int): Serve synthetic payloads with 'scale' times the rows. Default: 1
+        seed (int): Seed of the error injection and jitter. Default: None
+    """
+    def __init__(self,
+            host:str = "127.0.0.1",
+            port:int = 0,
+            data_path:Path = TEST_DATA_PATH,
+            latency:float = 0.0,
+            jitter:float = 0.0,
+            error_rate:float = 0.0,
+            error_status:int = 503,
+            calls_per_minute:int = 0,
+            scale:int = 1,
+            seed:int = None
+        ) -> None:
+        self.data_path = Path(data_path)
+        self.latency = max(0.0, latency)
+        self.jitter = max(0.0, jitter)
+        self.error_rate = min(max(0.0, error_rate), 1.0)
+        self.error_status = error_status
+        self.calls_per_minute = max(0, calls_per_minute)
+        self.scale = max(1, scale)
+
+        self._random = random.Random(seed)
+        self._indicators = _load_registry().indicator_set
+        self._lock = Lock()
+        self._payloads = {}
+        self._calls = {}
+        self._thread = None
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/query"
+
+
+    def _payload(self, filename:str) -> bytes:
+        """Returns the, maybe scaled, payload of 'filename', loaded once."""
+        with self._lock:
+            if filename not in self._payloads:
+                text = (self.data_path / filename).read_text()
+                if filename.endswith(".csv"):
+                    text = scale_csv(text, self.scale)
+                else:
+                    text = json.dumps(scale_json(json.loads(text), self.scale))
+                self._payloads[filename] = text.encode()
+            return self._payloads[filename]
+
+
+    def _throttled(self, apikey:str) -> bool:
+        """True when 'apikey' made calls_per_minute calls in the last minute."""
+        if self.calls_per_minute < 1: return False
+
+        now = monotonic()
+        with self._lock:
+            calls = self._calls.setdefault(apikey, deque())
+            while calls and now - calls[0] >= 60.0:
+                calls.popleft()
+            if len(calls) >= self.calls_per_minute:
+                return True
+            calls.append(now)
+            return False
+
+
+    def respond(self, query:dict) -> (int, str, bytes):
+        """Returns the (status, content type, body) of a /query call."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            error = self.error_rate > 0 and self._random.random() < self.error_rate
+        if delay > 0:
+            sleep(delay)
+
+        if error:
+            return self.error_status, "text/plain", b"Service Unavailable"
+
+        as_json = lambda x: (200, "application/json", json.dumps(x).encode())
+        apikey, function = query.get("apikey", ""), query.get("function", "")
+        if not apikey:
+            return as_json({"Error Message": INVALID_KEY})
+        if self._throttled(apikey):
+            return as_json({"Note": NOTE.format(n=self.calls_per_minute)})
+
+        if function == "LISTING_STATUS" and query.get("state") == "delisted":
+            filename = "mock_delisted_status.csv"
+        elif function in self._indicators:
+            filename = "mock_indicator.json"
+        else:
+            filename = PAYLOADS.get(function, None)
+
+        if filename is None or not (self.data_path / filename).exists():
+            return as_json({"Error Message": INVALID_CALL.format(function=function)})
+        if filename.endswith(".csv"):
+            return 200, "application/x-download", self._payload(filename)
+        return 200, "application/json", self._payload(filename)
+
+
+    def start(self): # -> StandInServer
+        """Serves on a daemon thread."""
+        if self._thread is None:
+            self._thread = Thread(target=self._httpd.serve_forever, name="av-stand-in", daemon=True)
+            self._thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+
+    def serve_forever(self) -> None:
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+
+    def __enter__(self): # -> StandInServer
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, so clients can pool connections
+    verbose = False
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/query":
+            status, content_type, body = 404, "text/plain", b"Not Found"
+        else:
+            status, content_type, body = self.server.stand_in.respond(dict(parse_qsl(url.query)))
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format:str, *args) -> None:
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def main(argv:list = None) -> None:
+    parser = argparse.ArgumentParser(description="Local AlphaVantage stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", default=str(TEST_DATA_PATH), help="Directory of the mock payloads")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many random seconds more")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of the failed calls")
+    parser.add_argument("--calls-per-minute", type=int, default=0, help="Calls per apikey before the Note, 0 is unlimited")
+    parser.add_argument("--scale", type=int, default=1, help="Synthetic payloads with this many times the rows")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    _Handler.verbose = args.verbose
+    server = StandInServer(
+        host=args.host, port=args.port, data_path=args.data, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status,
+        calls_per_minute=args.calls_per_minute, scale=args.scale, seed=args.seed
+    )
+    print(f"[+] AlphaVantage stand-in at {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
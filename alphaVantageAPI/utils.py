@@ -1,10 +1,34 @@
 # -*- coding: utf-8 -*-
-import time
 from functools import wraps
+from io import RawIOBase
 from pathlib import Path
 from time import perf_counter
 
 
+class _IterStream(RawIOBase):
+    """Read-only file object over an iterable of bytes chunks, i.e.
+    requests' Response.iter_content(), so a parser can consume a
+    download incrementally."""
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._view = memoryview(b"")
+
+    def readable(self): # -> bool
+        return True
+
+    def readinto(self, b): # -> int
+        while not len(self._view):
+            try:
+                self._view = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+
+        n = min(len(b), len(self._view))
+        b[:n] = self._view[:n]
+        self._view = self._view[n:]
+        return n
+
+
 def final_time(stime):
     time_diff = perf_counter() - stime
     return f"{time_diff * 1000:2.4f} ms ({time_diff:2.4f} s)"
@@ -21,18 +45,25 @@ def is_home(path:Path): # -> bool
     else:
         return False
 
+def _counted(chunks, call:dict):
+    """Yields the bytes chunks while adding their length to call["bytes"]."""
+    for chunk in chunks:
+        call["bytes"] += len(chunk)
+        yield chunk
+
+
 def timed(fn):
     """Simple timing decorator that stores the elapsed time
-    as a string property called 'timed' to the fn.
+    as a string property called 'timed' to the fn and returns
+    the result of the fn.
     """
     @wraps(fn)
     def _timer(*args, **kwargs):
-        start = time.time()
-        fn(*args, **kwargs)
-        end = time.time()
-        diff = end - start
+        start = perf_counter()
+        result = fn(*args, **kwargs)
+        diff = perf_counter() - start
 
         elapsed_time = f"[!] {fn.__name__} {diff * 1000:2.2f} ms ({diff:2.2f} s)"
-        fn.timed = elapsed_time
-        return fn
+        fn.timed = _timer.timed = elapsed_time
+        return result
     return _timer
\ No newline at end of file
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmarks of AlphaVantage over the mock payloads of tests/test_data.
+
+The payloads are also scaled to synthetic responses with 10x and 100x rows.
+Each case reports the min and median time of 'repeat' runs and the peak
+memory (tracemalloc) of one more run.
+
+    $ python -m benchmarks.bench
+    $ python -m benchmarks.bench --scales 1 10 --repeat 3 --filter save_df
+"""
+import argparse
+import json
+import tracemalloc
+
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from unittest.mock import patch
+
+import pandas as pd
+
+from alphaVantageAPI.alphavantage import AlphaVantage, arrow, excel
+from alphaVantageAPI._synthetic import scale_csv, scale_json
+
+
+TEST_DATA_PATH = Path(__file__).parent.parent / "tests" / "test_data"
+
+# function: mock json payload
+JSON_PAYLOADS = {
+    "CURRENCY_EXCHANGE_RATE": "mock_fx.json",
+    "FX_DAILY": "mock_fx_daily.json",
+    "FX_INTRADAY": "mock_fx_intraday.json",
+    "FX_MONTHLY": "mock_fx_monthly.json",
+    "FX_WEEKLY": "mock_fx_weekly.json",
+    "TIME_SERIES_DAILY_ADJUSTED": "mock_data.json",
+    "RSI": "mock_indicator.json",
+    "DIGITAL_CURRENCY_DAILY": "mock_digital.json",
+    "CRYPTO_RATING": "mock_digital_rating.json",
+    "GLOBAL_QUOTE": "mock_global_quote.json",
+    "OVERVIEW": "mock_overview.json",
+    "BALANCE_SHEET": "mock_balance_sheet.json",
+    "INCOME_STATEMENT": "mock_income_statement.json",
+    "CASH_FLOW": "mock_cash_flow.json",
+}
+
+# function: mock csv payload
+CSV_PAYLOADS = {
+    "EARNINGS_CALENDAR": "mock_earnings_cal.csv",
+    "IPO_CALENDAR": "mock_ipos_cal.csv",
+    "LISTING_STATUS": "mock_listed_status.csv",
+    "TIME_SERIES_INTRADAY_EXTENDED": "mock_intra_ext_adj_15min_y1m1.csv",
+}
+
+SYMBOL = "MSFT"
+
+
+class _Response(object):
+    """Minimal requests.Response stand-in, cheaper than a Mock."""
+    def __init__(self, content:bytes):
+        self.status_code = 200
+        self.content = content
+        self.text = content.decode()
+
+    def iter_content(self, chunk_size:int = 1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+def measure(fn, repeat:int = 5, setup = None) -> dict:
+    """Times fn(*setup()) 'repeat' times and traces the peak memory of one
+    more run. setup(), if any, is not timed."""
+    setup = setup or (lambda: ())
+
+    times, result = [], None
+    for _ in range(max(1, repeat)):
+        args = setup()
+        start = perf_counter()
+        result = fn(*args)
+        times.append(perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    try:
+        fn(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    rows = len(result) if hasattr(result, "__len__") and not isinstance(result, (str, bytes)) else None
+    return {"rows": rows, "min_ms": min(times) * 1000, "median_ms": median(times) * 1000, "peak_mb": peak / 2 ** 20}
+
+
+def _av(**kwargs) -> AlphaVantage:
+    return AlphaVantage(api_key="demo", premium=True, **kwargs)
+
+
+def bench_to_dataframe(scales:list):
+    """_to_dataframe of every json function."""
+    av = _av(clean=True)
+    for function, filename in JSON_PAYLOADS.items():
+        payload = json.loads((TEST_DATA_PATH / filename).read_text())
+        for n in scales:
+            scaled = scale_json(payload, n)
+            yield f"to_dataframe {function}", n, lambda scaled=scaled: av._to_dataframe(function, scaled), None
+
+
+def bench_csv_call(scales:list):
+    """The csv branch of _av_api_call: streamed into _csv_to_dataframe."""
+    av = _av(datatype="csv")
+    for function, filename in CSV_PAYLOADS.items():
+        text = (TEST_DATA_PATH / filename).read_text()
+        parameters = {"function": function, "symbol": SYMBOL, "interval": "15min", "slice": "year1month1", "adjusted": "true"}
+        for n in scales:
+            content = scale_csv(text, n).encode()
+            with patch("alphaVantageAPI.alphavantage.requests.get", side_effect=lambda *a, **k: _Response(content)):
+                yield f"av_api_call csv {function}", n, lambda: av._av_api_call(dict(parameters)), None
+
+
+def bench_simplify_columns(scales:list):
+    """_simplify_dataframe_columns of the raw time series DataFrames."""
+    av = _av(clean=False)
+    for function in ["TIME_SERIES_DAILY_ADJUSTED", "DIGITAL_CURRENCY_DAILY", "RSI"]:
+        payload = json.loads((TEST_DATA_PATH / JSON_PAYLOADS[function]).read_text())
+        for n in scales:
+            df = av._to_dataframe(function, scale_json(payload, n))
+            yield f"simplify_columns {function}", n, lambda x: av._simplify_dataframe_columns(function, x), lambda df=df: (df.copy(deep=False),)
+
+
+def bench_save_df(scales:list):
+    """_save_df of a daily adjusted time series to every output format."""
+    outputs = ["csv", "json", "pkl", "html", "txt"]
+    outputs += ["xlsx"] if excel else []
+    outputs += ["parquet", "feather"] if arrow else []
+
+    function = "TIME_SERIES_DAILY_ADJUSTED"
+    parameters = {"function": function, "symbol": SYMBOL}
+    payload = json.loads((TEST_DATA_PATH / JSON_PAYLOADS[function]).read_text())
+
+    with TemporaryDirectory() as tmpdir:
+        av = _av(clean=True, export_path=tmpdir)
+        for output in outputs:
+            av.output = output
+            for n in scales:
+                df = av._to_dataframe(function, scale_json(payload, n))
+
+                def setup():
+                    # Datasets are upserted, so start each run without one
+                    for path in Path(tmpdir).rglob("*"):
+                        if path.is_file(): path.unlink()
+                    return ()
+
+                yield f"save_df {output}", n, lambda df=df: av._save_df(function, df, parameters), setup
+
+
+def bench_accessor(scales:list):
+    """Overhead of the 'av' DataFrame accessor over the AlphaVantage class."""
+    import alphaVantageAPI._extension as extension
+
+    function = "TIME_SERIES_DAILY_ADJUSTED"
+    av = _av(clean=True)
+    df = av._to_dataframe(function, json.loads((TEST_DATA_PATH / JSON_PAYLOADS[function]).read_text()))
+
+    def calls(fn, n:int = 100):
+        for _ in range(n): fn()
+
+    with patch.object(AlphaVantage, "_av_api_call", return_value=df):
+        extension._av()
+        accessor = pd.DataFrame().av
+        yield "client data DA x100", 1, lambda: calls(lambda: av.data(SYMBOL, "DA")), None
+        yield "accessor daily_adjusted x100", 1, lambda: calls(lambda: accessor.daily_adjusted(SYMBOL)), None
+
+
+BENCHMARKS = [bench_to_dataframe, bench_csv_call, bench_simplify_columns, bench_save_df, bench_accessor]
+
+
+def run(scales:list = [1, 10, 100], repeat:int = 5, filter:str = None):
+    """Yields (case, scale, result) of the benchmarks matching 'filter'.
+    Benchmarks yield (case, scale, fn, setup) and are measured here."""
+    for benchmark in BENCHMARKS:
+        for case, n, fn, setup in benchmark(scales):
+            if filter is None or filter.lower() in case.lower():
+                yield case, n, measure(fn, repeat, setup)
+
+
+def main(argv:list = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline AlphaVantage benchmarks")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Payload row multipliers")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--filter", default=None, help="Only the cases containing this text")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<48}{'scale':>6}{'rows':>9}{'min ms':>11}{'median ms':>11}{'peak MB':>10}")
+    for case, n, r in run(args.scales, args.repeat, args.filter):
+        rows = "" if r["rows"] is None else r["rows"]
+        print(f"{case:<48}{n:>6}{rows:>9}{r['min_ms']:>11.3f}{r['median_ms']:>11.3f}{r['peak_mb']:>10.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ setup(
     ],
     extras_requires={
         "openpyxl": ["openpyxl"],
+        "pyarrow": ["pyarrow"],
     },
     package_data={
         "alphaVantageAPI":["data/api.json"],
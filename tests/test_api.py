@@ -1,5 +1,8 @@
 from alphaVantageAPI.alphavantage import AlphaVantage
+from alphaVantageAPI._export import _read_table
 
+from tempfile import TemporaryDirectory
+from threading import Event
 from unittest import TestCase
 from unittest.mock import patch
 from pandas import DataFrame, read_csv
@@ -163,7 +166,8 @@ class TestAlphaVantageAPI(TestCase):
 
 
     def setUp(self):
-        self.av = AlphaVantage(api_key=C.API_KEY_TEST)
+        # Premium, so the tests do not wait on the shared rate limit scheduler
+        self.av = AlphaVantage(api_key=C.API_KEY_TEST, premium=True)
 
     def tearDown(self):
         del self.av
@@ -664,6 +668,255 @@ class TestAlphaVantageAPI(TestCase):
         self.assertIsInstance(av_api_call(), dict)
 
 
+    @patch("alphaVantageAPI.alphavantage.AlphaVantage._av_api_call")
+    def test_intraday_extended_slices(self, mock_av_api_call):
+        slices = {
+            "year1month1": self.test_data_path / "mock_intra_ext_adj_15min_y1m1.csv",
+            "year1month2": self.test_data_path / "mock_intra_ext_adj_15min_y1m2.csv",
+        }
+        mock_av_api_call.side_effect = lambda parameters, **kwargs: \
+            self.av._csv_to_dataframe(parameters["function"], slices[parameters["slice"]].read_text())
+
+        download = self.av.intraday_extended(C.API_FUNDA_TEST, interval=15, slice=range(1, 3))
+
+        self.assertEqual(mock_av_api_call.call_count, 2)
+        self.assertIsInstance(download, DataFrame)
+        self.assertTrue(download.index.is_monotonic_increasing)
+        self.assertTrue(download.index.is_unique)
+        self.assertEqual(self.av._slices("all"), self.av._slices(range(1, 25)))
+        self.assertEqual(self.av._slices(["year1month2", "qwerty"]), ["year1month2"])
+        self.assertEqual(download.attrs["missing_slices"], [])
+
+
+    @patch("alphaVantageAPI.alphavantage.AlphaVantage._av_api_call")
+    def test_intraday_extended_failed_slices(self, mock_av_api_call):
+        csv = (self.test_data_path / "mock_intra_ext_adj_15min_y1m1.csv").read_text()
+        mock_av_api_call.side_effect = lambda parameters, **kwargs: \
+            self.av._csv_to_dataframe(parameters["function"], csv) if parameters["slice"] == "year1month1" else None
+
+        download = self.av.intraday_extended(C.API_FUNDA_TEST, interval=15, slice=range(1, 4))
+        self.assertIsInstance(download, DataFrame)
+        self.assertEqual(download.attrs["missing_slices"], ["year1month2", "year1month3"])
+
+        mock_av_api_call.side_effect = lambda parameters, **kwargs: None
+        self.assertIsNone(self.av.intraday_extended(C.API_FUNDA_TEST, interval=15, slice=range(1, 4)))
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_csv_functions_keep_datatype(self, mock_requests_get):
+        raw = (self.test_data_path / "mock_ipos_cal.csv").read_bytes()
+        mock_requests_get.return_value = _mock_response(chunks=[raw])
+
+        download = self.av.ipos()
+
+        self.assertIsInstance(download, DataFrame)
+        self.assertEqual(self.av.datatype, "json")
+
+
+    def test_csv_to_dataframe(self):
+        csv = (self.test_data_path / "mock_intra_ext_adj_15min_y1m1.csv").read_text()
+        df = self.av._csv_to_dataframe("TIME_SERIES_INTRADAY_EXTENDED", csv)
+
+        self.assertIsInstance(df, DataFrame)
+        self.assertEqual(df.index.name, "datetime")
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(list(df.columns), ["open", "high", "low", "close", "volume"])
+
+        csv = (self.test_data_path / "mock_listed_status.csv").read_text()
+        self.assertEqual(self.av._csv_to_dataframe("LISTING_STATUS", csv).shape, self.df_listed.shape)
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_listing_csv_stream(self, mock_requests_get):
+        self.av.datatype = "csv"
+        csv = (self.test_data_path / "mock_listed_status.csv").read_bytes()
+        chunks = [csv[i:i + 100] for i in range(0, len(csv), 100)]
+        mock_requests_get.return_value = _mock_response(chunks=chunks)
+
+        av_api_call = self.av._av_api_call(self.listing_parameters.copy(), chunk_size=100)
+
+        self.assertEqual(mock_requests_get.call_count, 1)
+        self.assertTrue(mock_requests_get.call_args.kwargs["stream"])
+        mock_requests_get.return_value.iter_content.assert_called_once_with(chunk_size=100)
+        self.assertIsInstance(av_api_call, DataFrame)
+        self.assertEqual(av_api_call.shape, self.df_listed.shape)
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_listing_csv_stream_to(self, mock_requests_get):
+        self.av.datatype = "csv"
+        csv = (self.test_data_path / "mock_listed_status.csv").read_bytes()
+        mock_requests_get.return_value = _mock_response(chunks=[csv[:50], csv[50:]])
+
+        with TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "listed.csv"
+            av_api_call = self.av._av_api_call(self.listing_parameters.copy(), stream_to=path)
+
+            self.assertEqual(av_api_call, path)
+            self.assertEqual(path.read_bytes(), csv)
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_data_json_stream(self, mock_requests_get):
+        self.av.output_size = "full"
+        raw = (self.test_data_path / "mock_data.json").read_bytes()
+        mock_requests_get.return_value = _mock_response(chunks=[raw[i:i + 512] for i in range(0, len(raw), 512)])
+
+        av_api_call = self.av._av_api_call(self.data_parameters.copy())
+
+        self.assertTrue(mock_requests_get.call_args.kwargs["stream"])
+        self.assertIsInstance(av_api_call, DataFrame)
+        self.assertTrue(av_api_call.equals(self.df_data))
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_data_process_pool(self, mock_requests_get):
+        self.av.processes = 2
+        mock_requests_get.return_value = _mock_response()
+        mock_requests_get.return_value.content = (self.test_data_path / "mock_data.json").read_bytes()
+
+        av_api_call = self.av._av_api_call(self.data_parameters.copy())
+        self.av.processes = 0
+
+        self.assertFalse(mock_requests_get.call_args.kwargs["stream"])
+        self.assertIsInstance(av_api_call, DataFrame)
+        self.assertTrue(av_api_call.equals(self.df_data))
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_timings(self, mock_requests_get):
+        self.av.clean = True
+        mock_requests_get.return_value = _mock_response(json_data=self.json_data)
+        self.av._av_api_call(self.data_parameters.copy())
+
+        timings = self.av.timings(self.data_parameters["function"])
+        phases = timings.index.get_level_values("phase").tolist()
+
+        self.assertEqual(phases, ["throttle", "network", "decode", "dataframe", "clean", "total"])
+        self.assertTrue((timings["count"] == 1).all())
+        self.assertLessEqual(timings.drop("total", level="phase")["mean"].sum(), timings.loc[(self.data_parameters["function"], "total"), "mean"])
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_call_history(self, mock_requests_get):
+        self.av.premium, self.av.history_size = True, 2
+        raw = (self.test_data_path / "mock_data.json").read_bytes()
+
+        for n in range(3):
+            mock_requests_get.return_value = _mock_response(json_data=self.json_data)
+            mock_requests_get.return_value.content = raw
+            parameters = self.data_parameters.copy()
+            self.av._av_api_call(parameters)
+
+        self.assertEqual(mock_requests_get.call_args.kwargs["params"]["apikey"], C.API_KEY_TEST)
+        self.assertNotIn("apikey", parameters)
+
+        history = self.av.call_history()
+        self.assertEqual(len(history), 2)
+        self.assertIs(self.av.last(), history[-1])
+        self.assertEqual(self.av.last(3), [])
+
+        call = self.av.last()
+        self.assertEqual((call.function, call.symbol, call.status, call.bytes, call.cached), (self.data_parameters["function"], C.API_DATA_TEST, 200, len(raw), False))
+        self.assertEqual([x[0] for x in call.timings], ["throttle", "network", "decode", "dataframe"])
+        self.assertNotIn(C.API_KEY_TEST, repr(history))
+
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_hooks_and_openmetrics(self, mock_requests_get):
+        self.av.premium, contexts = True, []
+        before, after = lambda x: contexts.append(("before", x)), lambda x: contexts.append(("after", x))
+        self.av.add_hook("before", before)
+        self.av.add_hook("after", after)
+        self.av.add_hook("after", lambda x: 1 / 0)
+        self.assertRaises(ValueError, self.av.add_hook, "during", before)
+
+        mock_requests_get.return_value = _mock_response(json_data=self.json_data)
+        download = self.av._av_api_call(self.data_parameters.copy())
+
+        self.assertEqual([x[0] for x in contexts], ["before", "after"])
+        self.assertEqual(contexts[0][1]["symbol"], C.API_DATA_TEST)
+        self.assertNotIn("apikey", contexts[0][1]["parameters"])
+        self.assertIs(contexts[1][1]["call"], self.av.last())
+        self.assertIs(contexts[1][1]["response"], download)
+
+        text = self.av.openmetrics()
+        self.assertIn(f'av_calls_total{{function="{self.data_parameters["function"]}",status="200"}} 1', text)
+        self.assertIn('av_hook_errors_total{when="after"} 1', text)
+
+        self.av.remove_hook("before", before)
+        self.av._av_api_call(self.data_parameters.copy())
+        self.assertEqual([x[0] for x in contexts], ["before", "after", "after"])
+
+
+    def test_save_df_async(self):
+        with TemporaryDirectory() as tmpdir:
+            self.av.export_path = tmpdir
+            self.av.export_async = True
+
+            path = self.av._save_df(self.data_parameters["function"], self.df_data, parameters=self.data_parameters)
+            self.assertEqual(self.av.flush(), [])
+            self.assertEqual(path, Path(tmpdir) / f"{C.API_DATA_TEST}_DA.csv")
+            self.assertEqual([x.name for x in Path(tmpdir).iterdir()], [path.name])
+
+            self.av.export_path = f"{tmpdir}/missing"
+            self.av._save_df(self.data_parameters["function"], self.df_data, parameters=self.data_parameters)
+            self.assertEqual(len(self.av.flush()), 1)
+
+
+    def test_save_df_async_snapshot(self):
+        with TemporaryDirectory() as tmpdir:
+            self.av.export_path = tmpdir
+            self.av.export_async = True
+            self.assertIs(self.av._export_writer, AlphaVantage(api_key=C.API_KEY_TEST)._export_writer)
+
+            # Holds the writer thread until df was changed
+            written = Event()
+            self.av._export_writer.submit(Path(tmpdir) / "wait", written.wait)
+
+            df = self.df_data.copy()
+            path = self.av._save_df(self.data_parameters["function"], df, parameters=self.data_parameters)
+            df.iloc[:, :] = 0
+            written.set()
+
+            self.assertEqual(self.av.flush(), [])
+            self.assertEqual(len(read_csv(path)), len(self.df_data))
+            self.assertFalse((read_csv(path, index_col=0) == 0).all().all())
+
+
+    def test_save_df_dataset_upsert(self):
+        self.av.clean = True
+        df = self.av._to_dataframe("TIME_SERIES_DAILY_ADJUSTED", self.json_data)
+
+        for output in ["parquet", "feather"]:
+            with TemporaryDirectory() as tmpdir:
+                self.av.export_path = tmpdir
+                self.av.output = output
+
+                self.av._save_df(self.data_parameters["function"], df.iloc[:60], parameters=self.data_parameters)
+                path = self.av._save_df(self.data_parameters["function"], df.iloc[40:], parameters=self.data_parameters)
+
+                self.assertEqual(path, Path(tmpdir) / "function=DA" / "interval=none" / f"symbol={C.API_DATA_TEST}" / f"data.{output}")
+                self.assertTrue(_read_table(path, output).equals(df))
+
+
+    def test_read_dataset(self):
+        self.av.clean = True
+        self.av.compression = "none"
+        df = self.av._to_dataframe("TIME_SERIES_DAILY_ADJUSTED", self.json_data)
+
+        for output in ["parquet", "feather"]:
+            with TemporaryDirectory() as tmpdir:
+                self.av.export_path = tmpdir
+                self.av.output = output
+                self.av._save_df(self.data_parameters["function"], df, parameters=self.data_parameters)
+
+                result = self.av.read(C.API_DATA_TEST.lower(), "DA", start="2018-04-02", end="2018-05-01")
+                self.assertTrue(result.equals(df.loc["2018-04-02":"2018-05-01"]))
+                self.assertEqual(self.av.read(C.API_DATA_TEST, "DA", table=True).num_rows, df.shape[0])
+                self.assertIsNone(self.av.read(C.API_DATA_TEST, "D"))
+
+
     # save_df tests
     # @patch("alphaVantageAPI.alphavantage.AlphaVantage.last")
     # @patch("alphaVantageAPI.alphavantage.DataFrame.to_csv")
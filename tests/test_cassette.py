@@ -0,0 +1,59 @@
+from alphaVantageAPI.alphavantage import AlphaVantage
+
+import gzip
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from pandas import DataFrame
+
+from .utils import Constant as C
+from .utils import load_json, _mock_response
+
+
+class TestCassette(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.json_data = load_json(C.TEST_DATA_PATH / "mock_data.json")
+        cls.raw_data = (C.TEST_DATA_PATH / "mock_data.json").read_bytes()
+        cls.raw_ipos = (C.TEST_DATA_PATH / "mock_ipos_cal.csv").read_bytes()
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_record_replay(self, mock_requests_get):
+        with TemporaryDirectory() as tmpdir:
+            cassette = Path(tmpdir) / "calls.jsonl.gz"
+            av = AlphaVantage(api_key="secret-key", premium=True, clean=True, cassette=str(cassette), cassette_mode="record")
+
+            mock_requests_get.return_value = _mock_response(json_data=self.json_data)
+            mock_requests_get.return_value.content = self.raw_data
+            recorded = av.data(C.API_DATA_TEST, "DA")
+
+            mock_requests_get.return_value = _mock_response()
+            mock_requests_get.return_value.content = self.raw_ipos
+            recorded_ipos = av.ipos()
+
+            self.assertTrue(cassette.exists())
+            self.assertNotIn(b"secret-key", gzip.decompress(cassette.read_bytes()))
+            self.assertFalse(av.last().cached)
+
+            mock_requests_get.reset_mock()
+            replay = AlphaVantage(api_key="secret-key", clean=True, cassette=str(cassette), cassette_mode="replay")
+
+            self.assertTrue(replay.data(C.API_DATA_TEST, "DA").equals(recorded))
+            self.assertTrue(replay.last().cached)
+            self.assertTrue(replay.ipos().equals(recorded_ipos))
+            self.assertIsNone(replay.data("IBM", "DA"))
+            mock_requests_get.assert_not_called()
+
+            self.assertEqual(replay._metrics.counter("av_cache_requests", result="hit"), 2)
+
+    def test_cassette_mode_property(self):
+        av = AlphaVantage(api_key=C.API_KEY_TEST)
+        self.assertEqual(av.cassette_mode, "off")
+        self.assertEqual(av.cassette, av.export_path / "cassette.jsonl.gz")
+
+        av.cassette_mode = "Replay"
+        self.assertEqual(av.cassette_mode, "replay")
+        av.cassette_mode = "other"
+        self.assertEqual(av.cassette_mode, "off")
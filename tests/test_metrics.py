@@ -0,0 +1,54 @@
+from alphaVantageAPI._metrics import _Call, _Histogram, _Metrics
+
+from time import sleep
+from unittest import TestCase
+
+
+class TestMetrics(TestCase):
+    def test_histogram_quantile(self):
+        h = _Histogram()
+        self.assertNotEqual(h.quantile(0.5), h.quantile(0.5))
+
+        for x in [0.02] * 90 + [2.0] * 10:
+            h.observe(x)
+
+        self.assertEqual(h.count, 100)
+        self.assertAlmostEqual(h.sum, 21.8)
+        self.assertEqual(h.max, 2.0)
+        self.assertTrue(0.01 < h.quantile(0.5) <= 0.025)
+        self.assertTrue(1.0 < h.quantile(0.99) <= 2.0)
+
+    def test_nested_phases_are_exclusive(self):
+        m = _Metrics()
+        with m.phase("F", "dataframe"):
+            with m.phase("F", "clean"):
+                sleep(0.05)
+        m.observe("F", "total", 1.0)
+
+        summary = m.summary("F")
+        self.assertEqual(summary.index.get_level_values("phase").tolist(), ["dataframe", "clean", "total"])
+        self.assertGreaterEqual(summary.loc[("F", "clean"), "max"], 0.05)
+        self.assertLess(summary.loc[("F", "dataframe"), "max"], 0.05)
+        self.assertEqual(m._local.stack, [])
+
+        m.reset()
+        self.assertTrue(m.summary().empty)
+
+    def test_render_openmetrics(self):
+        m = _Metrics()
+        m.record(_Call(0.0, "F", "IBM", 200, 100, 0.2, (), False))
+        m.record(_Call(0.0, "F", "IBM", None, 0, 0.01, (), True))
+        m.inc("av_hook_errors", when="after")
+
+        self.assertEqual(m.counter("av_calls", function="F"), 2)
+        self.assertEqual(m.counter("av_cache_requests", result="hit"), 1)
+
+        text = m.render()
+        self.assertTrue(text.endswith("# EOF\n"))
+        self.assertIn('av_calls_total{function="F",status="200"} 1', text)
+        self.assertIn('av_calls_total{function="F",status="none"} 1', text)
+        self.assertIn('av_response_bytes_total{function="F"} 100', text)
+        self.assertIn('av_hook_errors_total{when="after"} 1', text)
+        self.assertIn('av_phase_seconds_bucket{function="F",phase="total",le="0.25"} 2', text)
+        self.assertIn('av_phase_seconds_bucket{function="F",phase="total",le="+Inf"} 2', text)
+        self.assertIn('av_phase_seconds_count{function="F",phase="total"} 2', text)
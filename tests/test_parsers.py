@@ -0,0 +1,38 @@
+from alphaVantageAPI._parsers import _json_time_series
+
+from unittest import TestCase
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+
+from .utils import Constant as C
+
+
+def _chunks(data:bytes, size:int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+class TestJsonTimeSeries(TestCase):
+    def assertParsed(self, file:str, size:int, capacity:int = 1024):
+        import json
+        raw = (C.TEST_DATA_PATH / file).read_bytes()
+        expected = json.loads(raw)
+        result = _json_time_series(_chunks(raw, size), capacity)
+
+        key = [x for x in expected if not x.startswith("Meta Data")].pop()
+        self.assertEqual(result["Meta Data"], expected["Meta Data"])
+        self.assertIsInstance(result[key], DataFrame)
+        assert_frame_equal(result[key], DataFrame.from_dict(expected[key], dtype=float).T)
+
+
+    def test_data(self):
+        self.assertParsed("mock_data.json", 7)
+
+    def test_digital(self):
+        self.assertParsed("mock_digital.json", 4096, capacity=2)
+
+    def test_indicator(self):
+        self.assertParsed("mock_indicator.json", 1)
+
+    def test_note(self):
+        note = b'{"Note": "Thank you for using Alpha Vantage!"}'
+        self.assertEqual(_json_time_series(_chunks(note, 5)), {"Note": "Thank you for using Alpha Vantage!"})
@@ -46,6 +46,14 @@ class TestAlphaVantageAPIProperties(TestCase):
         self.assertFalse(self.av.export)
 
 
+    def test_export_async_property(self):
+        self.av.export_async = True
+        self.assertTrue(self.av.export_async)
+
+        self.av.export_async = None
+        self.assertFalse(self.av.export_async)
+
+
     def test_export_path_property(self):
         self.av.export_path = None
         self.assertIsInstance(self.av.export_path, Path)
@@ -77,6 +85,14 @@ class TestAlphaVantageAPIProperties(TestCase):
         self.assertEqual(self.av.output, csv)
 
 
+    def test_compression_property(self):
+        self.av.compression = "LZ4"
+        self.assertEqual(self.av.compression, "lz4")
+
+        self.av.compression = "other"
+        self.assertEqual(self.av.compression, "zstd")
+
+
     def test_datatype_property(self):
         csv = "csv"
         self.av.datatype = csv
@@ -125,6 +141,19 @@ class TestAlphaVantageAPIProperties(TestCase):
         self.assertFalse(self.av.clean)
 
 
+    def test_history_size_property(self):
+        self.assertEqual(self.av.history_size, 1000)
+
+        self.av._response_history.extend(range(5))
+        self.av.history_size = 3
+        self.assertEqual(self.av.history_size, 3)
+        self.assertEqual(self.av.call_history(), [2, 3, 4])
+
+        self.av.history_size = 0
+        self.assertEqual(self.av.history_size, 1000)
+        self.assertEqual(self.av.call_history(), [2, 3, 4])
+
+
     def test_api_initial_parameters(self):
         self.assertIsInstance(self.av.api_key, str)
         self.assertEqual(self.av.api_key, self.API_KEY_TEST)
@@ -170,6 +199,17 @@ class TestAlphaVantageAPIProperties(TestCase):
         self.assertIsInstance(self.av._parameters("SMA", "optional"), list)
 
 
+    def test_shared_registry(self):
+        other = AlphaVantage(api_key=self.API_KEY_TEST)
+        self.assertIs(self.av._registry, other._registry)
+        self.assertIs(self.av.series, other.series)
+
+        self.assertEqual(self.av._parameters("TIME_SERIES_INTRADAY", "required"), ["symbol", "interval"])
+        self.assertEqual(self.av._parameters("I", "required"), ["symbol", "interval"])
+        self.assertEqual(self.av._parameters("Qwerty", "optional"), [])
+        self.assertEqual(self.av._parameters("SMA", "other"), [])
+
+
     def test_function_alias_method(self):
         self.assertEqual(self.av._function_alias("TIME_SERIES_INTRADAY"), "I")
 
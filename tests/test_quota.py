@@ -0,0 +1,68 @@
+from alphaVantageAPI.alphavantage import AlphaVantage
+from alphaVantageAPI._quota import _QuotaLedger
+
+import json
+
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from .utils import Constant as C
+from .utils import load_json, _mock_response
+
+
+def _admit(path:str, n:int) -> int:
+    ledger = _QuotaLedger(path, "key", 1000)
+    return sum(ledger.admit("interactive") for _ in range(n))
+
+
+class TestQuota(TestCase):
+    def test_admission_by_priority(self):
+        with TemporaryDirectory() as tmpdir:
+            ledger = _QuotaLedger(tmpdir, "key", 10)
+
+            self.assertEqual(sum(ledger.admit("batch") for _ in range(10)), 8)
+            self.assertEqual(sum(ledger.admit("realtime") for _ in range(10)), 1)
+            self.assertEqual(sum(ledger.admit("interactive") for _ in range(10)), 1)
+
+            status = ledger.status()
+            self.assertEqual((status["used"], status["remaining"]), (10, 0))
+            self.assertEqual(status["priorities"], {"batch": 8, "realtime": 1, "interactive": 1})
+            self.assertEqual(status["rejected"], {"batch": 2, "realtime": 9, "interactive": 9})
+            self.assertNotIn("key", ledger.file.name)
+
+    def test_day_boundary(self):
+        with TemporaryDirectory() as tmpdir:
+            ledger = _QuotaLedger(tmpdir, "key", 10)
+            ledger.exhaust()
+            self.assertFalse(ledger.admit("interactive"))
+
+            data = json.loads(ledger.file.read_text())
+            ledger.file.write_text(json.dumps({**data, "day": "2000-01-01"}))
+            self.assertTrue(ledger.admit("interactive"))
+            self.assertEqual(ledger.status()["used"], 1)
+
+    def test_shared_across_processes(self):
+        with TemporaryDirectory() as tmpdir:
+            with get_context("spawn").Pool(3) as pool:
+                admitted = sum(pool.starmap(_admit, [(tmpdir, 20)] * 3))
+            self.assertEqual(admitted, 60)
+            self.assertEqual(_QuotaLedger(tmpdir, "key", 1000).status()["used"], 60)
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_daily_quota(self, mock_requests_get):
+        mock_requests_get.return_value = _mock_response(json_data=load_json(C.TEST_DATA_PATH / "mock_data.json"))
+
+        with TemporaryDirectory() as tmpdir:
+            av = AlphaVantage(api_key=C.API_KEY_TEST, premium=True, export_path=tmpdir, daily_quota=5)
+
+            results = [av.data(C.API_DATA_TEST, "DA", priority="batch") for _ in range(5)]
+            self.assertEqual([x is not None for x in results], [True] * 4 + [False])
+            self.assertIsNotNone(av.data(C.API_DATA_TEST, "DA"))
+            self.assertIsNone(av.data(C.API_DATA_TEST, "DA"))
+
+            self.assertEqual(mock_requests_get.call_count, 5)
+            self.assertEqual(av.quota()["remaining"], 0)
+            self.assertEqual(av._metrics.counter("av_quota_rejections"), 2)
+            self.assertRaises(ValueError, av.data, C.API_DATA_TEST, "DA", priority="urgent")
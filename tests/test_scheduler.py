@@ -0,0 +1,89 @@
+from alphaVantageAPI.alphavantage import AlphaVantage
+from alphaVantageAPI._scheduler import _Scheduler, _scheduler
+
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import monotonic, sleep
+from unittest import TestCase
+from unittest.mock import patch
+
+from .utils import Constant as C
+from .utils import load_json, _mock_response
+
+
+INTERVAL = 0.05
+
+
+def _queue(scheduler:_Scheduler, calls:list) -> list:
+    """Queues (priority, caller, weight, deadline) calls behind a granted one
+    and returns the order in which they were granted."""
+    granted, threads = [], []
+    scheduler.acquire() # Busy for an interval, so all the calls wait
+
+    def _call(n:int, priority:str, caller:str, weight:float, deadline:float) -> None:
+        if scheduler.acquire(priority, caller, weight, deadline) is not None:
+            granted.append(n)
+
+    for n, args in enumerate(calls):
+        threads.append(Thread(target=_call, args=(n, *args)))
+        threads[-1].start()
+        while sum(scheduler.waiting().values()) < n + 1:
+            sleep(0.001)
+
+    for thread in threads:
+        thread.join()
+    return granted
+
+
+class TestScheduler(TestCase):
+    def test_interval(self):
+        scheduler = _Scheduler(interval=INTERVAL)
+        self.assertFalse(scheduler.acquire())
+
+        start = monotonic()
+        self.assertTrue(scheduler.acquire())
+        self.assertGreaterEqual(monotonic() - start, INTERVAL * 0.9)
+
+    def test_priority_order(self):
+        calls = [("batch", "a", 1.0, None), ("realtime", "a", 1.0, None), ("interactive", "a", 1.0, None), ("batch", "a", 1.0, None)]
+        self.assertEqual(_queue(_Scheduler(interval=INTERVAL), calls), [2, 1, 0, 3])
+
+    def test_weighted_fair_share(self):
+        # Caller "a" queues all its calls first but "b" has twice the weight
+        calls = [("batch", "a", 1.0, None)] * 4 + [("batch", "b", 2.0, None)] * 4
+        granted = _queue(_Scheduler(interval=INTERVAL), calls)
+
+        callers = ["a" if n < 4 else "b" for n in granted]
+        self.assertEqual(callers[:6], ["b", "a", "b", "b", "a", "b"])
+        self.assertEqual(callers[:6].count("b"), 2 * callers[:6].count("a"))
+
+    def test_earliest_deadline_first(self):
+        far, near = monotonic() + 10, monotonic() + 5
+        calls = [("realtime", "a", 1.0, None), ("realtime", "a", 1.0, far), ("realtime", "a", 1.0, near)]
+        self.assertEqual(_queue(_Scheduler(interval=INTERVAL), calls), [2, 1, 0])
+
+    def test_deadline_miss(self):
+        scheduler = _Scheduler(interval=10)
+        self.assertFalse(scheduler.acquire())
+
+        start = monotonic()
+        self.assertIsNone(scheduler.acquire("interactive", deadline=monotonic() + INTERVAL))
+        self.assertLess(monotonic() - start, 1)
+        self.assertEqual(sum(scheduler.waiting().values()), 0)
+
+    def test_shared_by_apikey(self):
+        self.assertIs(_scheduler("key"), _scheduler("key"))
+        self.assertIsNot(_scheduler("key"), _scheduler("other key"))
+
+    @patch("alphaVantageAPI.alphavantage.requests.get")
+    def test_deadline_miss_refunds_quota(self, mock_requests_get):
+        mock_requests_get.return_value = _mock_response(json_data=load_json(C.TEST_DATA_PATH / "mock_data.json"))
+
+        with TemporaryDirectory() as tmpdir:
+            av = AlphaVantage(api_key="deadline test key", export_path=tmpdir, daily_quota=5)
+            self.assertIsNotNone(av.data(C.API_DATA_TEST, "DA"))
+            self.assertIsNone(av.data(C.API_DATA_TEST, "DA", deadline=INTERVAL))
+
+            self.assertEqual(av.quota()["used"], 1)
+            self.assertEqual(av._metrics.counter("av_deadline_misses", priority="interactive"), 1)
+            self.assertEqual(mock_requests_get.call_count, 1)
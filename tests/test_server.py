@@ -0,0 +1,54 @@
+from alphaVantageAPI.alphavantage import AlphaVantage
+from alphaVantageAPI.server import StandInServer
+
+from unittest import TestCase
+from pandas import DataFrame
+
+from .utils import Constant as C
+
+
+class TestStandInServer(TestCase):
+    def test_data(self):
+        with StandInServer() as server:
+            av = AlphaVantage(api_key=C.API_KEY_TEST, premium=True, clean=True, end_point=server.url)
+            self.assertEqual(av.end_point, server.url)
+
+            df = av.data(C.API_DATA_TEST, "DA")
+            self.assertIsInstance(df, DataFrame)
+            self.assertEqual(df.shape[0], 100)
+
+            av.datatype = "csv"
+            self.assertEqual(av.ipos().shape[0], 15)
+            self.assertEqual(av.last().status, 200)
+
+    def test_scale(self):
+        with StandInServer(scale=10) as server:
+            av = AlphaVantage(api_key=C.API_KEY_TEST, premium=True, end_point=server.url)
+            self.assertEqual(av.data(C.API_DATA_TEST, "DA").shape[0], 1000)
+
+    def test_note_throttle(self):
+        with StandInServer(calls_per_minute=2) as server:
+            av = AlphaVantage(api_key=C.API_KEY_TEST, premium=True, end_point=server.url)
+            results = [av.data(C.API_DATA_TEST, "D") for _ in range(3)]
+
+            self.assertIsInstance(results[1], DataFrame)
+            self.assertIsNone(results[2])
+            self.assertEqual(av._metrics.counter("av_api_messages", message="Note"), 1)
+
+            other = AlphaVantage(api_key="other", premium=True, end_point=server.url)
+            self.assertIsInstance(other.data(C.API_DATA_TEST, "D"), DataFrame)
+
+    def test_error_injection(self):
+        with StandInServer(error_rate=1.0, error_status=503, latency=0.01) as server:
+            av = AlphaVantage(api_key=C.API_KEY_TEST, premium=True, end_point=server.url)
+            self.assertIsNone(av.data(C.API_DATA_TEST, "D"))
+            self.assertEqual(av.last().status, 503)
+            self.assertGreaterEqual(av.last().seconds, 0.01)
+
+    def test_invalid_call(self):
+        server = StandInServer()
+        self.assertIn(b"Error Message", server.respond({"function": "QWERTY", "apikey": "demo"})[2])
+        self.assertIn(b"apikey", server.respond({"function": "TIME_SERIES_DAILY"})[2])
+        self.assertIn(b"Time Series", server.respond({"function": "TIME_SERIES_DAILY", "apikey": "demo"})[2])
+        self.assertIn(b"Technical Analysis", server.respond({"function": "SMA", "apikey": "demo"})[2])
+        server.stop()
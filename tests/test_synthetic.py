@@ -0,0 +1,30 @@
+from alphaVantageAPI._synthetic import scale_csv, scale_json
+
+from unittest import TestCase
+
+from .utils import Constant as C
+from .utils import load_json
+
+
+class TestSynthetic(TestCase):
+    def test_scale_json(self):
+        payload = load_json(C.TEST_DATA_PATH / "mock_data.json")
+        scaled = scale_json(payload, 10)
+        series = scaled["Time Series (Daily)"]
+
+        self.assertEqual(scaled["Meta Data"], payload["Meta Data"])
+        self.assertEqual(len(series), 10 * len(payload["Time Series (Daily)"]))
+        self.assertEqual(list(series)[:2], list(payload["Time Series (Daily)"])[:2])
+        self.assertEqual(list(series), sorted(series, reverse=True))
+
+        quote = load_json(C.TEST_DATA_PATH / "mock_global_quote.json")
+        self.assertEqual(scale_json(quote, 10), quote)
+        self.assertIs(scale_json(payload, 1), payload)
+
+    def test_scale_csv(self):
+        text = (C.TEST_DATA_PATH / "mock_ipos_cal.csv").read_text()
+        header, rows = text.split("\n", 1)[0], text.strip().split("\n")[1:]
+
+        scaled = scale_csv(text, 3).strip().split("\n")
+        self.assertEqual(scaled[0], header)
+        self.assertEqual(scaled[1:], rows * 3)
@@ -0,0 +1,39 @@
+from alphaVantageAPI._registry import _load_registry
+
+from unittest import TestCase
+
+
+class TestValidate(TestCase):
+    def setUp(self):
+        self.registry = _load_registry()
+        self.parameters = {"function": "BBANDS", "symbol": "MSFT"}
+
+
+    def test_valid(self):
+        kwargs = {"matype": -2.0, "nbdevup": -2, "nbdevdn": "1.5", "other": 1}
+        parameters = self.registry.validate("BBANDS", self.parameters, kwargs)
+
+        self.assertEqual(parameters["matype"], 2)
+        self.assertIsInstance(parameters["matype"], int)
+        self.assertEqual(parameters["nbdevup"], 2.0)
+        self.assertEqual(parameters["nbdevdn"], 1.5)
+        self.assertNotIn("other", parameters)
+
+
+    def test_only_function_options(self):
+        parameters = self.registry.validate("SMA", {"function": "SMA"}, {"matype": 1, "fastlimit": 0.5})
+        self.assertEqual(parameters, {"function": "SMA"})
+
+
+    def test_invalid(self):
+        with self.assertRaisesRegex(ValueError, "BBANDS: 'matype' must be one of"):
+            self.registry.validate("BBANDS", self.parameters, {"matype": 9})
+
+        with self.assertRaisesRegex(ValueError, "'nbdevup' must be a number"):
+            self.registry.validate("BBANDS", self.parameters, {"nbdevup": "two"})
+
+        with self.assertRaisesRegex(ValueError, "MAMA: 'fastlimit' must be less than 1"):
+            self.registry.validate("MAMA", {"function": "MAMA"}, {"fastlimit": 1.5})
+
+        with self.assertRaisesRegex(ValueError, "'slowlimit' must be greater than 0"):
+            self.registry.validate("MAMA", {"function": "MAMA"}, {"slowlimit": 0})
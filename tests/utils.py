@@ -21,7 +21,7 @@ def load_json(file: str):
     content.close()
     return json_data
 
-def _mock_response(status=200, text_data=None, json_data=None, raise_for_status=None):
+def _mock_response(status=200, text_data=None, json_data=None, raise_for_status=None, chunks=None):
     mock_response = mock.Mock()
     mock_response.raise_for_status = mock.Mock()
     if raise_for_status:
@@ -32,4 +32,6 @@ def _mock_response(status=200, text_data=None, json_data=None, raise_for_status=
         mock_response.text = mock.Mock(return_value=text_data)
     elif json_data is not None:
         mock_response.json = mock.Mock(return_value=json_data)
+    elif chunks is not None:
+        mock_response.iter_content = mock.Mock(return_value=iter(chunks))
     return mock_response
\ No newline at end of file